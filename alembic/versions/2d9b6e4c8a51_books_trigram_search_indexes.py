@@ -0,0 +1,32 @@
+"""Add pg_trgm GIN indexes for book title and author search
+
+Revision ID: 2d9b6e4c8a51
+Revises: 7c2e5a9d3f18
+Create Date: 2026-10-15 16:05:12.447310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d9b6e4c8a51'
+down_revision: Union[str, None] = '7c2e5a9d3f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_books_title_trgm', 'books', ['title'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.create_index('ix_books_author_trgm', 'books', ['author'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'author': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_books_author_trgm', table_name='books', postgresql_using='gin')
+    op.drop_index('ix_books_title_trgm', table_name='books', postgresql_using='gin')
@@ -0,0 +1,43 @@
+"""Store book embeddings as a pgvector column
+
+Revision ID: 3b7e91c2d4a0
+Revises: 58fc1154d9e7
+Create Date: 2026-10-15 09:12:41.318224
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlmodel
+import pgvector.sqlalchemy
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e91c2d4a0'
+down_revision: Union[str, None] = '58fc1154d9e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    # Serialized embeddings use the '[x, y, ...]' text form, which casts directly to vector
+    op.alter_column('books', 'embedding',
+               existing_type=sqlmodel.sql.sqltypes.AutoString(),
+               type_=pgvector.sqlalchemy.Vector(1536),
+               existing_nullable=True,
+               postgresql_using='embedding::vector(1536)')
+    op.create_index('ix_books_embedding_hnsw', 'books', ['embedding'], unique=False,
+                    postgresql_using='hnsw',
+                    postgresql_ops={'embedding': 'vector_cosine_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_books_embedding_hnsw', table_name='books')
+    op.alter_column('books', 'embedding',
+               existing_type=pgvector.sqlalchemy.Vector(1536),
+               type_=sqlmodel.sql.sqltypes.AutoString(),
+               existing_nullable=True,
+               postgresql_using='embedding::text')
@@ -0,0 +1,32 @@
+"""Add (user_id, created_at DESC) and (book_id, created_at DESC) interaction indexes
+
+Revision ID: 4e7a1c9b3d62
+Revises: 2d9b6e4c8a51
+Create Date: 2026-10-15 18:42:07.918254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e7a1c9b3d62'
+down_revision: Union[str, None] = '2d9b6e4c8a51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_user_book_interactions_user_created', 'user_book_interactions',
+                    ['user_id', sa.text('created_at DESC')], unique=False)
+    op.create_index('ix_user_book_interactions_book_created', 'user_book_interactions',
+                    ['book_id', sa.text('created_at DESC')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_book_interactions_book_created', table_name='user_book_interactions')
+    op.drop_index('ix_user_book_interactions_user_created', table_name='user_book_interactions')
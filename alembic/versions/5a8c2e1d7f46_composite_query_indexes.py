@@ -0,0 +1,44 @@
+"""Add composite and partial indexes for the service query patterns
+
+Revision ID: 5a8c2e1d7f46
+Revises: e6b0d3f8a917
+Create Date: 2026-10-15 12:08:33.614052
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a8c2e1d7f46'
+down_revision: Union[str, None] = 'e6b0d3f8a917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_book_category_links_category_id_book_id', 'book_category_links', ['category_id', 'book_id'], unique=False)
+    op.create_index('ix_books_average_rating_ratings_count', 'books', ['average_rating', 'ratings_count'], unique=False,
+                    postgresql_where=sa.text('ratings_count > 0'))
+    op.create_index('ix_user_book_interactions_user_book_type', 'user_book_interactions', ['user_id', 'book_id', 'interaction_type'], unique=False)
+    op.create_index('ix_user_book_interactions_book_type', 'user_book_interactions', ['book_id', 'interaction_type'], unique=False,
+                    postgresql_include=['rating'])
+    op.create_index('ix_book_recommendations_user_active', 'book_recommendations', ['user_id', 'is_viewed'], unique=False,
+                    postgresql_where=sa.text('is_dismissed = false'))
+    # Covered by the leading columns of the composite indexes above
+    op.drop_index(op.f('ix_user_book_interactions_user_id'), table_name='user_book_interactions')
+    op.drop_index(op.f('ix_user_book_interactions_book_id'), table_name='user_book_interactions')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_user_book_interactions_book_id'), 'user_book_interactions', ['book_id'], unique=False)
+    op.create_index(op.f('ix_user_book_interactions_user_id'), 'user_book_interactions', ['user_id'], unique=False)
+    op.drop_index('ix_book_recommendations_user_active', table_name='book_recommendations')
+    op.drop_index('ix_user_book_interactions_book_type', table_name='user_book_interactions')
+    op.drop_index('ix_user_book_interactions_user_book_type', table_name='user_book_interactions')
+    op.drop_index('ix_books_average_rating_ratings_count', table_name='books')
+    op.drop_index('ix_book_category_links_category_id_book_id', table_name='book_category_links')
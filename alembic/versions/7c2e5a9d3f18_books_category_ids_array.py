@@ -0,0 +1,69 @@
+"""Denormalize book categories into a GIN-indexed uuid[] column
+
+Revision ID: 7c2e5a9d3f18
+Revises: 9f3d7b2c6a15
+Create Date: 2026-10-15 14:32:51.208417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e5a9d3f18'
+down_revision: Union[str, None] = '9f3d7b2c6a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('books', sa.Column('category_ids', postgresql.ARRAY(sa.Uuid()), server_default=sa.text("'{}'"), nullable=False))
+    op.execute("""
+        UPDATE books
+        SET category_ids = l.category_ids
+        FROM (
+            SELECT book_id, array_agg(category_id ORDER BY category_id) AS category_ids
+            FROM book_category_links
+            GROUP BY book_id
+        ) l
+        WHERE books.id = l.book_id;
+    """)
+    op.create_index('ix_books_category_ids', 'books', ['category_ids'], unique=False, postgresql_using='gin')
+    # book_category_links stays the source of truth; rebuild the affected books' arrays on every change
+    op.execute("""
+        CREATE OR REPLACE FUNCTION sync_book_category_ids() RETURNS trigger AS $$
+        BEGIN
+            UPDATE books
+            SET category_ids = ARRAY(
+                SELECT category_id FROM book_category_links
+                WHERE book_id = books.id
+                ORDER BY category_id
+            )
+            WHERE id IN (
+                SELECT book_id FROM changed_links
+            );
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    # Statement-level transition tables touch each book once per statement, not once per link
+    for event, table in (('INSERT', 'NEW'), ('DELETE', 'OLD')):
+        op.execute(f"""
+            CREATE TRIGGER trg_book_category_links_sync_{event.lower()}
+            AFTER {event} ON book_category_links
+            REFERENCING {table} TABLE AS changed_links
+            FOR EACH STATEMENT EXECUTE FUNCTION sync_book_category_ids();
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_book_category_links_sync_delete ON book_category_links")
+    op.execute("DROP TRIGGER IF EXISTS trg_book_category_links_sync_insert ON book_category_links")
+    op.execute("DROP FUNCTION IF EXISTS sync_book_category_ids()")
+    op.drop_index('ix_books_category_ids', table_name='books', postgresql_using='gin')
+    op.drop_column('books', 'category_ids')
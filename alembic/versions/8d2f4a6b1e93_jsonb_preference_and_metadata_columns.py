@@ -0,0 +1,46 @@
+"""Store preference and recommendation metadata as JSONB
+
+Revision ID: 8d2f4a6b1e93
+Revises: 3b7e91c2d4a0
+Create Date: 2026-10-15 10:03:17.542901
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f4a6b1e93'
+down_revision: Union[str, None] = '3b7e91c2d4a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JSONB_COLUMNS = [
+    ('user_preferences', 'category_preferences'),
+    ('user_preferences', 'custom_preferences'),
+    ('book_recommendations', 'recommendation_metadata'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table_name, column_name in JSONB_COLUMNS:
+        op.alter_column(table_name, column_name,
+                   existing_type=sqlmodel.sql.sqltypes.AutoString(),
+                   type_=postgresql.JSONB(astext_type=sa.Text()),
+                   existing_nullable=True,
+                   postgresql_using=f'{column_name}::jsonb')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table_name, column_name in JSONB_COLUMNS:
+        op.alter_column(table_name, column_name,
+                   existing_type=postgresql.JSONB(astext_type=sa.Text()),
+                   type_=sqlmodel.sql.sqltypes.AutoString(),
+                   existing_nullable=True,
+                   postgresql_using=f'{column_name}::text')
@@ -0,0 +1,85 @@
+"""Maintain book rating aggregates with a trigger
+
+Revision ID: 9f3d7b2c6a15
+Revises: 5a8c2e1d7f46
+Create Date: 2026-10-15 13:47:09.926583
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f3d7b2c6a15'
+down_revision: Union[str, None] = '5a8c2e1d7f46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Apply a rating delta to a book in O(1), without rescanning its interactions
+    op.execute("""
+        CREATE OR REPLACE FUNCTION apply_book_rating_delta(
+            p_book_id uuid,
+            p_count_delta integer,
+            p_sum_delta double precision
+        ) RETURNS void AS $$
+        BEGIN
+            UPDATE books
+            SET average_rating = CASE
+                    WHEN ratings_count + p_count_delta <= 0 THEN 0
+                    ELSE (COALESCE(average_rating, 0) * ratings_count + p_sum_delta)
+                         / (ratings_count + p_count_delta)
+                END,
+                ratings_count = GREATEST(ratings_count + p_count_delta, 0)
+            WHERE id = p_book_id;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    # Retract the old rating and apply the new one; covers inserts, edits, type changes and deletes
+    op.execute("""
+        CREATE OR REPLACE FUNCTION maintain_book_ratings() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                IF OLD.interaction_type = 'RATE' AND OLD.rating IS NOT NULL THEN
+                    PERFORM apply_book_rating_delta(OLD.book_id, -1, -OLD.rating);
+                END IF;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                IF NEW.interaction_type = 'RATE' AND NEW.rating IS NOT NULL THEN
+                    PERFORM apply_book_rating_delta(NEW.book_id, 1, NEW.rating);
+                END IF;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_user_book_interactions_book_ratings
+        AFTER INSERT OR DELETE OR UPDATE OF book_id, interaction_type, rating
+        ON user_book_interactions
+        FOR EACH ROW EXECUTE FUNCTION maintain_book_ratings();
+    """)
+    # Start from exact values
+    op.execute("""
+        UPDATE books
+        SET ratings_count = COALESCE(r.ratings_count, 0),
+            average_rating = COALESCE(r.average_rating, 0)
+        FROM books b
+        LEFT JOIN (
+            SELECT book_id, COUNT(*) AS ratings_count, AVG(rating) AS average_rating
+            FROM user_book_interactions
+            WHERE interaction_type = 'RATE' AND rating IS NOT NULL
+            GROUP BY book_id
+        ) r ON r.book_id = b.id
+        WHERE books.id = b.id;
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_user_book_interactions_book_ratings ON user_book_interactions")
+    op.execute("DROP FUNCTION IF EXISTS maintain_book_ratings()")
+    op.execute("DROP FUNCTION IF EXISTS apply_book_rating_delta(uuid, integer, double precision)")
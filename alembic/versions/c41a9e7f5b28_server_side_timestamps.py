@@ -0,0 +1,60 @@
+"""Assign created_at and updated_at on the database server
+
+Revision ID: c41a9e7f5b28
+Revises: 8d2f4a6b1e93
+Create Date: 2026-10-15 10:41:06.207735
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41a9e7f5b28'
+down_revision: Union[str, None] = '8d2f4a6b1e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TIMESTAMPED_TABLES = [
+    'books',
+    'categories',
+    'users',
+    'book_recommendations',
+    'user_book_interactions',
+    'user_preferences',
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing values were written with datetime.utcnow(), so they are interpreted as UTC
+    for table_name in TIMESTAMPED_TABLES:
+        op.alter_column(table_name, 'created_at',
+                   existing_type=sa.DateTime(),
+                   type_=sa.DateTime(timezone=True),
+                   existing_nullable=False,
+                   server_default=sa.func.now(),
+                   postgresql_using="created_at AT TIME ZONE 'UTC'")
+        op.alter_column(table_name, 'updated_at',
+                   existing_type=sa.DateTime(),
+                   type_=sa.DateTime(timezone=True),
+                   existing_nullable=True,
+                   postgresql_using="updated_at AT TIME ZONE 'UTC'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table_name in TIMESTAMPED_TABLES:
+        op.alter_column(table_name, 'updated_at',
+                   existing_type=sa.DateTime(timezone=True),
+                   type_=sa.DateTime(),
+                   existing_nullable=True,
+                   postgresql_using="updated_at AT TIME ZONE 'UTC'")
+        op.alter_column(table_name, 'created_at',
+                   existing_type=sa.DateTime(timezone=True),
+                   type_=sa.DateTime(),
+                   existing_nullable=False,
+                   server_default=None,
+                   postgresql_using="created_at AT TIME ZONE 'UTC'")
@@ -0,0 +1,74 @@
+"""Use native UUID primary and foreign keys
+
+Revision ID: e6b0d3f8a917
+Revises: c41a9e7f5b28
+Create Date: 2026-10-15 11:26:52.870413
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b0d3f8a917'
+down_revision: Union[str, None] = 'c41a9e7f5b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRIMARY_KEY_TABLES = [
+    'books',
+    'categories',
+    'users',
+    'book_recommendations',
+    'user_book_interactions',
+    'user_preferences',
+]
+
+# (table, column, referred table)
+FOREIGN_KEYS = [
+    ('book_category_links', 'book_id', 'books'),
+    ('book_category_links', 'category_id', 'categories'),
+    ('book_recommendations', 'book_id', 'books'),
+    ('book_recommendations', 'user_id', 'users'),
+    ('user_book_interactions', 'book_id', 'books'),
+    ('user_book_interactions', 'user_id', 'users'),
+    ('user_preferences', 'user_id', 'users'),
+]
+
+
+def _convert_keys(existing_type, type_, cast: str) -> None:
+    # Foreign keys must be dropped while the referenced columns change type
+    for table_name, column_name, _ in FOREIGN_KEYS:
+        op.drop_constraint(f'{table_name}_{column_name}_fkey', table_name, type_='foreignkey')
+    
+    for table_name in PRIMARY_KEY_TABLES:
+        op.alter_column(table_name, 'id',
+                   existing_type=existing_type,
+                   type_=type_,
+                   existing_nullable=False,
+                   postgresql_using=f'id::{cast}')
+    
+    for table_name, column_name, _ in FOREIGN_KEYS:
+        op.alter_column(table_name, column_name,
+                   existing_type=existing_type,
+                   type_=type_,
+                   existing_nullable=False,
+                   postgresql_using=f'{column_name}::{cast}')
+    
+    for table_name, column_name, referred_table in FOREIGN_KEYS:
+        op.create_foreign_key(f'{table_name}_{column_name}_fkey', table_name, referred_table,
+                              [column_name], ['id'])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing keys are uuid4 strings and cast directly; new rows get UUIDv7 values
+    _convert_keys(sqlmodel.sql.sqltypes.AutoString(), sa.Uuid(), 'uuid')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _convert_keys(sa.Uuid(), sqlmodel.sql.sqltypes.AutoString(), 'varchar')
@@ -1,3 +1,9 @@
-from db.engine import get_engine, get_session, create_db_and_tables
+from db.engine import (
+    get_async_engine,
+    get_session,
+    get_db_with_commit,
+    create_db_and_tables,
+    dispose_engine
+)
 
-__all__ = ["get_engine", "get_session", "create_db_and_tables"]
\ No newline at end of file
+__all__ = ["get_async_engine", "get_session", "get_db_with_commit", "create_db_and_tables", "dispose_engine"]
\ No newline at end of file
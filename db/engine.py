@@ -1,23 +1,52 @@
-from sqlmodel import create_engine, Session, SQLModel
-from utils.config import settings
+import threading
+from contextlib import contextmanager
+from typing import AsyncGenerator, Iterator, List, Optional
+from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import ORMExecuteState, raiseload
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from utils.config import settings, EnvironmentType
 from utils.exceptions.db import ConnectionException
 
 
-def get_engine():
+# Process-wide engine, created lazily on first use and reused by every session
+_ENGINE: Optional[AsyncEngine] = None
+_ENGINE_LOCK = threading.Lock()
+
+
+def _create_async_engine() -> AsyncEngine:
     """
-    Create and return a SQLAlchemy engine instance using connection details from settings.
+    Build an async SQLAlchemy engine (asyncpg driver) using connection details from settings.
     """
     try:
-        connection_string = settings.db.DB_URI
+        connection_string = settings.db.ASYNC_DB_URI
         if not connection_string:
             raise ValueError("Database connection string is not configured.")
         
-        engine = create_engine(
-            connection_string,
+        # The asyncpg dialect reads its prepared statement cache size from the URL
+        url = make_url(connection_string).update_query_dict({
+            "prepared_statement_cache_size": str(settings.db.PREPARED_STATEMENT_CACHE_SIZE)
+        })
+        
+        return create_async_engine(
+            url,
             echo=settings.app.DEBUG,
-            connect_args={"connect_timeout": 10}
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=settings.db.POOL_SIZE,
+            max_overflow=settings.db.MAX_OVERFLOW,
+            pool_timeout=settings.db.POOL_TIMEOUT,
+            pool_recycle=settings.db.POOL_RECYCLE,
+            pool_pre_ping=settings.db.POOL_PRE_PING,
+            # Reuse the most recently returned connection so a small set stays warm
+            # (server plan caches, asyncpg prepared-statement caches)
+            pool_use_lifo=True,
+            query_cache_size=settings.db.QUERY_CACHE_SIZE,
+            connect_args={"timeout": 10}
         )
-        return engine
     except Exception as e:
         raise ConnectionException(
             message="Failed to create database engine",
@@ -25,15 +54,141 @@ def get_engine():
         )
 
 
-def get_session():
+def get_async_engine() -> AsyncEngine:
+    """
+    Return the shared async SQLAlchemy engine, creating it on first call.
+    """
+    global _ENGINE
+    if _ENGINE is None:
+        with _ENGINE_LOCK:
+            if _ENGINE is None:
+                _ENGINE = _create_async_engine()
+    return _ENGINE
+
+
+async def dispose_engine() -> None:
+    """
+    Dispose of the shared engine and its connection pool.
+    Call on application shutdown.
+    """
+    global _ENGINE
+    engine, _ENGINE = _ENGINE, None
+    if engine is not None:
+        await engine.dispose()
+
+
+class RaiseloadSession(Session):
+    """
+    Session used in the development and testing environments.
+    Lazy relationship loads raise instead of silently issuing one query per row.
+    """
+
+
+@event.listens_for(RaiseloadSession, "do_orm_execute")
+def _raise_on_lazy_load(orm_execute_state: ORMExecuteState) -> None:
+    """Attach raiseload() to every lazy relationship of a top-level SELECT."""
+    if (
+        not orm_execute_state.is_select
+        or orm_execute_state.is_relationship_load
+        or orm_execute_state.is_column_load
+    ):
+        return
+    
+    # The caller chose its own loader strategy; leave the statement alone
+    statement = orm_execute_state.statement
+    if getattr(statement, "_with_options", ()):
+        return
+    
+    # raiseload("*") would also override selectin relationships declared on the models,
+    # so only relationships that would otherwise lazy-load are switched to raise
+    options = [
+        raiseload(relationship.class_attribute)
+        for mapper in orm_execute_state.all_mappers
+        for relationship in mapper.relationships
+        if relationship.lazy in ("select", True)
+    ]
+    if options:
+        orm_execute_state.statement = statement.options(*options)
+
+
+def _get_sync_session_class() -> type:
+    """Return the sync session class backing AsyncSession for the current environment."""
+    if settings.app.ENVIRONMENT in (EnvironmentType.DEVELOPMENT, EnvironmentType.TESTING):
+        return RaiseloadSession
+    return Session
+
+
+class QueryCounter:
+    """Statements sent to the database inside a count_queries() block."""
+    
+    def __init__(self):
+        self.statements: List[str] = []
+    
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(engine: Optional[AsyncEngine] = None) -> Iterator[QueryCounter]:
+    """
+    Record every statement the engine executes inside the block.
+    
+    Lets tests put an upper bound on round trips so new N+1 patterns fail loudly:
+    
+        with count_queries() as queries:
+            await service.get_user_interactions(db, user_id)
+        assert queries.count <= 3
+    """
+    sync_engine = (engine or get_async_engine()).sync_engine
+    counter = QueryCounter()
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+    
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """
-    Create and yield a database session.
+    Create and yield an async database session.
     For use as a FastAPI dependency.
     """
-    engine = get_engine()
-    with Session(engine) as session:
+    async with AsyncSession(
+        get_async_engine(),
+        expire_on_commit=False,
+        sync_session_class=_get_sync_session_class()
+    ) as session:
         try:
             yield session
         except Exception as e:
-            session.rollback()
-            raise e
\ No newline at end of file
+            await session.rollback()
+            raise e
+
+
+async def get_db_with_commit(
+    session: AsyncSession = Depends(get_session)
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Yield a session and commit it once the route returns successfully.
+    For use as a FastAPI dependency on write endpoints.
+    
+    Exit code of yield dependencies runs before the response is sent on the
+    pinned FastAPI release, so a client never receives a success response for
+    a transaction that has not been committed. If the route raises, the commit
+    is skipped and get_session() rolls back.
+    """
+    yield session
+    await session.commit()
+
+
+async def create_db_and_tables() -> None:
+    """
+    Create all tables registered on the SQLModel metadata.
+    """
+    async with get_async_engine().begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
\ No newline at end of file
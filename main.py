@@ -0,0 +1,31 @@
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from db.engine import get_async_engine, dispose_engine
+from services.interaction import view_event_buffer
+from utils.cache.redis_client import close_redis_clients
+from utils.config import settings
+from utils.logging.background import start_background_logging, stop_background_logging
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the shared database engine on startup and release its and Redis' pools on shutdown."""
+    # Log handlers write from a background thread, so logging never blocks the event loop
+    start_background_logging()
+    get_async_engine()
+    view_event_buffer.start()
+    yield
+    await view_event_buffer.stop()
+    await dispose_engine()
+    await close_redis_clients()
+    stop_background_logging()
+
+
+app = FastAPI(
+    title=settings.app.PROJECT_NAME,
+    version=settings.app.VERSION,
+    # Encode every response with orjson instead of the stdlib json module
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
\ No newline at end of file
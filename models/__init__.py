@@ -1,14 +1,34 @@
-from models.models import (
-    TimestampMixin,
-    User,
-    Book,
-    Category,
-    BookCategoryLink,
-    UserBookInteraction,
-    InteractionType,
-    UserPreference,
-    BookRecommendation,
-)
+import importlib
+
+
+# Models are imported on first attribute access (PEP 562), so lightweight modules
+# such as models.enums can be used without building every table
+_lazy_map = {
+    "TimestampMixin": "models.models",
+    "User": "models.models",
+    "Book": "models.models",
+    "Category": "models.models",
+    "BookCategoryLink": "models.models",
+    "UserBookInteraction": "models.models",
+    "InteractionType": "models.enums",
+    "UserPreference": "models.models",
+    "BookRecommendation": "models.models"
+}
+
+
+def __getattr__(name):
+    try:
+        module = _lazy_map[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_map))
+
 
 # Export all models for easy imports
 __all__ = [
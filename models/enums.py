@@ -0,0 +1,12 @@
+from enum import Enum
+
+
+class InteractionType(str, Enum):
+    """Enum for types of interactions a user can have with a book."""
+    VIEW = "view"  # User viewed book details
+    LIKE = "like"  # User liked the book
+    DISLIKE = "dislike"  # User disliked the book
+    BOOKMARK = "bookmark"  # User bookmarked the book for later
+    RATE = "rate"  # User rated the book
+    REVIEW = "review"  # User reviewed the book
+    RECOMMEND = "recommend"  # Book was recommended to user
\ No newline at end of file
@@ -1,20 +1,48 @@
 from datetime import datetime
-from enum import Enum
-from typing import List, Optional
-import json
+from typing import Any, Dict, List, Optional
+import os
+import time
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Column, DateTime, Enum as SAEnum, Index, func, text
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID as PG_UUID
 from sqlmodel import Field, Relationship, SQLModel
 import uuid
+from models.enums import InteractionType
 
-def generate_uuid():
-    return str(uuid.uuid4())
+# Dimensionality of the configured embedding model (text-embedding-ada-002)
+EMBEDDING_DIMENSIONS = 1536
+
+def generate_uuid() -> uuid.UUID:
+    """
+    Generate a time-ordered UUIDv7 (RFC 9562).
+    
+    The leading 48-bit millisecond timestamp keeps primary key inserts
+    append-only in the B-tree instead of landing on random pages.
+    """
+    unix_ts_ms = time.time_ns() // 1_000_000
+    value = (unix_ts_ms & 0xFFFF_FFFF_FFFF) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
 
 
 # ========== Base Models ==========
 
 class TimestampMixin:
     """Mixin to add created_at and updated_at timestamps to models."""
-    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
-    updated_at: Optional[datetime] = Field(default=None, sa_column_kwargs={"onupdate": datetime.utcnow})
+    # Both timestamps are assigned by Postgres (now()), not by the application
+    created_at: Optional[datetime] = Field(
+        default=None,
+        sa_type=DateTime(timezone=True),
+        sa_column_kwargs={"server_default": func.now()},
+        nullable=False,
+        index=True
+    )
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        sa_type=DateTime(timezone=True),
+        sa_column_kwargs={"onupdate": func.now()}
+    )
 
 
 # ========== Link Tables ==========
@@ -22,22 +50,13 @@ class TimestampMixin:
 class BookCategoryLink(SQLModel, table=True):
     """Link table for many-to-many relationship between books and categories."""
     __tablename__ = "book_category_links"
+    __table_args__ = (
+        # The primary key leads with book_id; category lookups need their own index
+        Index("ix_book_category_links_category_id_book_id", "category_id", "book_id"),
+    )
 
-    book_id: str = Field(foreign_key="books.id", primary_key=True)
-    category_id: str = Field(foreign_key="categories.id", primary_key=True)
-
-
-# ========== Enums ==========
-
-class InteractionType(str, Enum):
-    """Enum for types of interactions a user can have with a book."""
-    VIEW = "view"  # User viewed book details
-    LIKE = "like"  # User liked the book
-    DISLIKE = "dislike"  # User disliked the book
-    BOOKMARK = "bookmark"  # User bookmarked the book for later
-    RATE = "rate"  # User rated the book
-    REVIEW = "review"  # User reviewed the book
-    RECOMMEND = "recommend"  # Book was recommended to user
+    book_id: uuid.UUID = Field(foreign_key="books.id", primary_key=True)
+    category_id: uuid.UUID = Field(foreign_key="categories.id", primary_key=True)
 
 
 # ========== Main Models ==========
@@ -46,7 +65,7 @@ class User(SQLModel, TimestampMixin, table=True):
     """User model representing a user of the application."""
     __tablename__ = "users"
 
-    id: Optional[str] = Field(default_factory=generate_uuid, primary_key=True)
+    id: Optional[uuid.UUID] = Field(default_factory=generate_uuid, primary_key=True)
     username: str = Field(index=True, unique=True)
     email: str = Field(index=True, unique=True)
     hashed_password: str
@@ -56,18 +75,44 @@ class User(SQLModel, TimestampMixin, table=True):
     is_admin: bool = Field(default=False)
     
     # Relationships
+    # Preferences are read alongside the user almost everywhere: load them eagerly.
+    # Interaction history is unbounded and must be queried explicitly.
     preferences: Optional["UserPreference"] = Relationship(
         back_populates="user",
-        sa_relationship_kwargs={"uselist": False}
+        sa_relationship_kwargs={"uselist": False, "lazy": "selectin"}
+    )
+    interactions: List["UserBookInteraction"] = Relationship(
+        back_populates="user",
+        sa_relationship_kwargs={"lazy": "raise"}
     )
-    interactions: List["UserBookInteraction"] = Relationship(back_populates="user")
 
 
 class Book(SQLModel, TimestampMixin, table=True):
     """Book model representing a book in the system."""
     __tablename__ = "books"
+    __table_args__ = (
+        # Popular books: ratings_count > 0 ORDER BY average_rating DESC, ratings_count DESC
+        Index(
+            "ix_books_average_rating_ratings_count",
+            "average_rating",
+            "ratings_count",
+            postgresql_where=text("ratings_count > 0")
+        ),
+        # Category filters: category_ids @> ARRAY[:category_id]
+        Index("ix_books_category_ids", "category_ids", postgresql_using="gin"),
+        # Substring search: title/author LIKE '%...%' (pg_trgm)
+        Index("ix_books_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("ix_books_author_trgm", "author", postgresql_using="gin", postgresql_ops={"author": "gin_trgm_ops"}),
+        # Nearest neighbours by cosine distance (find_similar_books); pgvector's default m and ef_construction
+        Index(
+            "ix_books_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding": "vector_cosine_ops"}
+        ),
+    )
 
-    id: Optional[str] = Field(default_factory=generate_uuid, primary_key=True)
+    id: Optional[uuid.UUID] = Field(default_factory=generate_uuid, primary_key=True)
     title: str = Field(index=True)
     author: str = Field(index=True)
     isbn: Optional[str] = Field(default=None, unique=True, index=True)
@@ -76,34 +121,54 @@ class Book(SQLModel, TimestampMixin, table=True):
     publisher: Optional[str] = None
     language: Optional[str] = None
     page_count: Optional[int] = None
+    # Maintained incrementally by the maintain_book_ratings trigger on user_book_interactions
     average_rating: Optional[float] = Field(default=0.0)
     ratings_count: int = Field(default=0)
     cover_image_url: Optional[str] = None
     
-    # Vector embedding for similarity search
-    embedding: Optional[str] = None  # Will store serialized embedding vector
+    # Vector embedding for similarity search (pgvector, HNSW cosine index)
+    embedding: Optional[List[float]] = Field(
+        default=None,
+        sa_column=Column(Vector(EMBEDDING_DIMENSIONS), nullable=True)
+    )
+    
+    # Denormalized copy of book_category_links so category filters are a single GIN
+    # index scan instead of a join. Kept in sync by the sync_book_category_ids trigger.
+    category_ids: List[uuid.UUID] = Field(
+        default_factory=list,
+        sa_column=Column(ARRAY(PG_UUID(as_uuid=True)), nullable=False, server_default=text("'{}'"))
+    )
     
     # Relationships
+    # Categories are loaded per query with selectinload(Book.categories).
+    # Interactions and recommendations are unbounded and must be queried explicitly.
     categories: List["Category"] = Relationship(
         back_populates="books", 
         link_model=BookCategoryLink
     )
-    interactions: List["UserBookInteraction"] = Relationship(back_populates="book")
-    recommendations: List["BookRecommendation"] = Relationship(back_populates="book")
+    interactions: List["UserBookInteraction"] = Relationship(
+        back_populates="book",
+        sa_relationship_kwargs={"lazy": "raise"}
+    )
+    recommendations: List["BookRecommendation"] = Relationship(
+        back_populates="book",
+        sa_relationship_kwargs={"lazy": "raise"}
+    )
 
 
 class Category(SQLModel, TimestampMixin, table=True):
     """Category model representing book genres and categories."""
     __tablename__ = "categories"
 
-    id: Optional[str] = Field(default_factory=generate_uuid, primary_key=True)
+    id: Optional[uuid.UUID] = Field(default_factory=generate_uuid, primary_key=True)
     name: str = Field(index=True, unique=True)
     description: Optional[str] = None
     
     # Relationships
     books: List[Book] = Relationship(
         back_populates="categories", 
-        link_model=BookCategoryLink
+        link_model=BookCategoryLink,
+        sa_relationship_kwargs={"lazy": "raise"}
     )
 
 
@@ -111,11 +176,14 @@ class UserPreference(SQLModel, TimestampMixin, table=True):
     """Model to store user preferences for recommendations."""
     __tablename__ = "user_preferences"
 
-    id: Optional[str] = Field(default_factory=generate_uuid, primary_key=True)
-    user_id: str = Field(foreign_key="users.id", index=True, unique=True)
+    id: Optional[uuid.UUID] = Field(default_factory=generate_uuid, primary_key=True)
+    user_id: uuid.UUID = Field(foreign_key="users.id", index=True, unique=True)
     
-    # Category preferences (serialized dict with category_id -> weight)
-    category_preferences: Optional[str] = None
+    # Category preferences (category_id -> weight)
+    category_preferences: Optional[Dict[str, float]] = Field(
+        default_factory=dict,
+        sa_column=Column(JSONB, nullable=True)
+    )
     
     # Reading preferences
     preferred_language: Optional[str] = None
@@ -125,56 +193,70 @@ class UserPreference(SQLModel, TimestampMixin, table=True):
     max_publication_year: Optional[int] = None
     min_rating: Optional[float] = None
     
-    # Custom preferences stored as serialized JSON string
-    custom_preferences: Optional[str] = Field(default="{}")
+    # Free-form custom preferences
+    custom_preferences: Optional[Dict[str, Any]] = Field(
+        default_factory=dict,
+        sa_column=Column(JSONB, nullable=True)
+    )
     
     # Relationship
     user: User = Relationship(back_populates="preferences")
-    
-    def get_category_preferences(self):
-        """Deserialize category preferences from string to dict."""
-        if not self.category_preferences:
-            return {}
-        return json.loads(self.category_preferences)
-    
-    def set_category_preferences(self, preferences):
-        """Serialize category preferences from dict to string."""
-        self.category_preferences = json.dumps(preferences)
-        
-    def get_custom_preferences(self):
-        """Deserialize custom preferences from string to dict."""
-        if not self.custom_preferences:
-            return {}
-        return json.loads(self.custom_preferences)
-    
-    def set_custom_preferences(self, preferences):
-        """Serialize custom preferences from dict to string."""
-        self.custom_preferences = json.dumps(preferences)
 
 
 class UserBookInteraction(SQLModel, TimestampMixin, table=True):
     """Model to track user interactions with books."""
     __tablename__ = "user_book_interactions"
+    __table_args__ = (
+        # Interactions of a user (optionally on a book, of a type); also serves user_id-only lookups
+        Index("ix_user_book_interactions_user_book_type", "user_id", "book_id", "interaction_type"),
+        # Interactions on a book; includes rating so rating aggregates are index-only scans
+        Index(
+            "ix_user_book_interactions_book_type",
+            "book_id",
+            "interaction_type",
+            postgresql_include=["rating"]
+        ),
+        # Newest-first feeds: WHERE user_id/book_id = ... ORDER BY created_at DESC LIMIT n
+        # become index scans instead of a sort over every matching row
+        Index("ix_user_book_interactions_user_created", "user_id", text("created_at DESC")),
+        Index("ix_user_book_interactions_book_created", "book_id", text("created_at DESC")),
+    )
 
-    id: Optional[str] = Field(default_factory=generate_uuid, primary_key=True)
-    user_id: str = Field(foreign_key="users.id", index=True)
-    book_id: str = Field(foreign_key="books.id", index=True)
-    interaction_type: InteractionType
+    id: Optional[uuid.UUID] = Field(default_factory=generate_uuid, primary_key=True)
+    user_id: uuid.UUID = Field(foreign_key="users.id")
+    book_id: uuid.UUID = Field(foreign_key="books.id")
+    # Native Postgres ENUM (4 bytes per row), matching the type created by the initial migration
+    interaction_type: InteractionType = Field(
+        sa_type=SAEnum(InteractionType, name="interactiontype", native_enum=True),
+        nullable=False
+    )
     rating: Optional[float] = None  # 1-5 star rating
     review_text: Optional[str] = None
     
     # Relationships
     user: User = Relationship(back_populates="interactions")
-    book: Book = Relationship(back_populates="interactions")
+    book: Book = Relationship(
+        back_populates="interactions",
+        sa_relationship_kwargs={"lazy": "selectin"}
+    )
 
 
 class BookRecommendation(SQLModel, TimestampMixin, table=True):
     """Model to store book recommendations for users."""
     __tablename__ = "book_recommendations"
+    __table_args__ = (
+        # Active recommendations for a user; dismissed rows are never indexed
+        Index(
+            "ix_book_recommendations_user_active",
+            "user_id",
+            "is_viewed",
+            postgresql_where=text("is_dismissed = false")
+        ),
+    )
 
-    id: Optional[str] = Field(default_factory=generate_uuid, primary_key=True)
-    user_id: str = Field(foreign_key="users.id", index=True)
-    book_id: str = Field(foreign_key="books.id", index=True)
+    id: Optional[uuid.UUID] = Field(default_factory=generate_uuid, primary_key=True)
+    user_id: uuid.UUID = Field(foreign_key="users.id", index=True)
+    book_id: uuid.UUID = Field(foreign_key="books.id", index=True)
     
     # Recommendation metadata
     score: float  # Recommendation confidence score (0-1)
@@ -185,22 +267,18 @@ class BookRecommendation(SQLModel, TimestampMixin, table=True):
     # Method used to generate this recommendation
     recommendation_source: str = Field(index=True)  # e.g., "collaborative", "content-based", "rag", "hybrid"
     
-    # Metadata about the recommendation process (stored as serialized JSON)
-    recommendation_metadata: Optional[str] = Field(default="{}")
+    # Metadata about the recommendation process
+    recommendation_metadata: Optional[Dict[str, Any]] = Field(
+        default_factory=dict,
+        sa_column=Column(JSONB, nullable=True)
+    )
     
     # When the recommendation was viewed by the user
     viewed_at: Optional[datetime] = None
     
     # Relationships
     user: User = Relationship()
-    book: Book = Relationship(back_populates="recommendations")
-    
-    def get_metadata(self):
-        """Deserialize metadata from string to dict."""
-        if not self.metadata:
-            return {}
-        return json.loads(self.metadata)
-    
-    def set_metadata(self, metadata):
-        """Serialize metadata from dict to string."""
-        self.metadata = json.dumps(metadata)
\ No newline at end of file
+    book: Book = Relationship(
+        back_populates="recommendations",
+        sa_relationship_kwargs={"lazy": "selectin"}
+    )
\ No newline at end of file
@@ -1,92 +1,116 @@
-from schemas.base import (
-    ResponseSchema,
-    PaginatedResponseSchema,
-    ErrorSchema,
-    PaginationParams
-)
+import importlib
 
-from schemas.user import (
-    UserBase,
-    UserCreate,
-    UserUpdate,
-    UserPasswordUpdate,
-    UserRead,
-    UsersListResponse
-)
 
-from schemas.book import (
-    CategoryBase,
-    CategoryCreate,
-    CategoryUpdate,
-    CategoryRead,
-    BookBase,
-    BookCreate,
-    BookUpdate,
-    BookSearchParams,
-    BookWithCategories,
-    BooksListResponse
-)
+# Schema modules are imported on first attribute access (PEP 562), so pulling in
+# one schema does not load every other schema module and its dependencies
+_lazy_map = {
+    "ResponseSchema": "schemas.base",
+    "PaginatedResponseSchema": "schemas.base",
+    "ErrorSchema": "schemas.base",
+    "PaginationParams": "schemas.base",
+    "to_msg": "schemas.base",
+    
+    "UserBase": "schemas.user",
+    "UserCreate": "schemas.user",
+    "UserUpdate": "schemas.user",
+    "UserPasswordUpdate": "schemas.user",
+    "UserRead": "schemas.user",
+    "UsersListResponse": "schemas.user",
+    "UserReadMsg": "schemas.user",
+    "user_list_adapter": "schemas.user",
+    
+    "CategoryBase": "schemas.book",
+    "CategoryCreate": "schemas.book",
+    "CategoryUpdate": "schemas.book",
+    "CategoryRead": "schemas.book",
+    "BookBase": "schemas.book",
+    "BookCreate": "schemas.book",
+    "BookUpdate": "schemas.book",
+    "BookSearchParams": "schemas.book",
+    "BookWithCategories": "schemas.book",
+    "BooksListResponse": "schemas.book",
+    "CategoryReadMsg": "schemas.book",
+    "BookReadMsg": "schemas.book",
+    "category_list_adapter": "schemas.book",
+    "book_list_adapter": "schemas.book",
+    
+    "InteractionCreate": "schemas.interaction",
+    "InteractionUpdate": "schemas.interaction",
+    "UserPreferenceBase": "schemas.interaction",
+    "UserPreferenceCreate": "schemas.interaction",
+    "UserPreferenceUpdate": "schemas.interaction",
+    "UserPreferenceRead": "schemas.interaction",
+    "InteractionRead": "schemas.interaction",
+    "InteractionWithBook": "schemas.interaction",
+    "InteractionWithUser": "schemas.interaction",
+    "InteractionListResponse": "schemas.interaction",
+    "InteractionReadMsg": "schemas.interaction",
+    "interaction_list_adapter": "schemas.interaction",
+    
+    "RecommendationSource": "schemas.recommendation",
+    "RecommendationCreate": "schemas.recommendation",
+    "RecommendationUpdate": "schemas.recommendation",
+    "RecommendationRead": "schemas.recommendation",
+    "RecommendationWithBook": "schemas.recommendation",
+    "RecommendationListResponse": "schemas.recommendation",
+    "RecommendationBatchRequest": "schemas.recommendation",
+    "RecommendationFeedbackRequest": "schemas.recommendation",
+    "RecommendationReadMsg": "schemas.recommendation",
+    "recommendation_list_adapter": "schemas.recommendation",
+    
+    "LoginRequest": "schemas.auth",
+    "LoginResponse": "schemas.auth",
+    "SessionData": "schemas.auth",
+    "LogoutRequest": "schemas.auth",
+    "PasswordResetRequest": "schemas.auth",
+    "PasswordResetConfirm": "schemas.auth"
+}
+
+
+def __getattr__(name):
+    try:
+        module = _lazy_map[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
 
-from schemas.interaction import (
-    InteractionCreate,
-    InteractionUpdate,
-    UserPreferenceBase,
-    UserPreferenceCreate,
-    UserPreferenceUpdate,
-    UserPreferenceRead,
-    InteractionRead,
-    InteractionWithBook,
-    InteractionWithUser,
-    InteractionListResponse
-)
 
-from schemas.recommendation import (
-    RecommendationSource,
-    RecommendationCreate,
-    RecommendationUpdate,
-    RecommendationRead,
-    RecommendationWithBook,
-    RecommendationListResponse,
-    RecommendationBatchRequest,
-    RecommendationFeedbackRequest
-)
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_map))
 
-from schemas.auth import (
-    LoginRequest,
-    LoginResponse,
-    SessionData,
-    LogoutRequest,
-    PasswordResetRequest,
-    PasswordResetConfirm
-)
 
 # For convenient imports
 __all__ = [
     # Base schemas
     "ResponseSchema", "PaginatedResponseSchema",
-    "ErrorSchema", "PaginationParams",
+    "ErrorSchema", "PaginationParams", "to_msg",
     
     # User schemas
     "UserBase", "UserCreate", "UserUpdate", "UserPasswordUpdate",
-    "UserRead", "UsersListResponse",
+    "UserRead", "UsersListResponse", "UserReadMsg", "user_list_adapter",
     
     # Book and Category schemas
     "CategoryBase", "CategoryCreate", "CategoryUpdate", "CategoryRead",
     "BookBase", "BookCreate", "BookUpdate", "BookSearchParams",
     "BookWithCategories", "BooksListResponse",
+    "CategoryReadMsg", "BookReadMsg", "category_list_adapter", "book_list_adapter",
     
     # Interaction and Preference schemas
     "InteractionCreate", "InteractionUpdate",
     "UserPreferenceBase", "UserPreferenceCreate", "UserPreferenceUpdate",
     "UserPreferenceRead", "InteractionRead",
     "InteractionWithBook", "InteractionWithUser",
-    "InteractionListResponse",
+    "InteractionListResponse", "InteractionReadMsg", "interaction_list_adapter",
     
     # Recommendation schemas
     "RecommendationSource", "RecommendationCreate", "RecommendationUpdate",
     "RecommendationRead", "RecommendationWithBook",
     "RecommendationListResponse", "RecommendationBatchRequest",
-    "RecommendationFeedbackRequest",
+    "RecommendationFeedbackRequest", "RecommendationReadMsg",
+    "recommendation_list_adapter",
     
     # Auth schemas
     "LoginRequest", "LoginResponse", "SessionData", "LogoutRequest",
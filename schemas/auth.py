@@ -1,6 +1,6 @@
-from typing import Optional
+from uuid import UUID
 from sqlmodel import SQLModel, Field
-from pydantic import validator
+from pydantic import ValidationInfo, field_validator
 
 
 class LoginRequest(SQLModel):
@@ -20,14 +20,14 @@ class LoginRequest(SQLModel):
 class LoginResponse(SQLModel):
     """Schema for login response"""
     session_id: str
-    user_id: int
+    user_id: UUID
     username: str
     is_admin: bool
 
 
 class SessionData(SQLModel):
     """Schema for session data stored in Redis"""
-    user_id: int
+    user_id: UUID
     username: str
     is_admin: bool = False
     created_at: int  # Unix timestamp
@@ -57,9 +57,10 @@ class PasswordResetConfirm(SQLModel):
     new_password: str = Field(..., min_length=8)
     confirm_password: str
     
-    @validator('confirm_password')
-    def passwords_match(cls, v, values):
-        if 'new_password' in values and v != values['new_password']:
+    @field_validator('confirm_password')
+    @classmethod
+    def passwords_match(cls, v: str, info: ValidationInfo) -> str:
+        if 'new_password' in info.data and v != info.data['new_password']:
             raise ValueError('Passwords do not match')
         return v
     
@@ -1,9 +1,23 @@
-from datetime import datetime
-from typing import Optional, Any, Dict, List, Generic, TypeVar
+from typing import Optional, Any, Dict, List, Generic, Type, TypeVar
+import msgspec
 from sqlmodel import SQLModel, Field
 
 # Define type variables for generic schemas
 T = TypeVar('T')
+M = TypeVar('M', bound=msgspec.Struct)
+
+
+def to_msg(struct_cls: Type[M], obj: Any, **values: Any) -> M:
+    """
+    Copy an ORM row or read schema into its msgspec output mirror.
+    
+    Fields are taken from obj.__dict__ without validation; pass nested values
+    (e.g. categories) explicitly as keyword arguments.
+    """
+    data = obj.__dict__
+    fields = {name: data[name] for name in struct_cls.__struct_fields__ if name in data}
+    fields.update(values)
+    return struct_cls(**fields)
 
 
 class ResponseSchema(SQLModel, Generic[T]):
@@ -22,12 +36,14 @@ class PaginatedResponseSchema(SQLModel, Generic[T]):
     error: Optional[str] = None
     
     # Pagination metadata
-    total: int
-    page: int
+    # Keyset-paginated lists return next_cursor and skip the COUNT(*) behind the totals
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
     has_next: bool
-    has_prev: bool
+    has_prev: bool = False
 
 
 class ErrorSchema(SQLModel):
@@ -43,5 +59,6 @@ class PaginationParams(SQLModel):
     """Query parameters for pagination"""
     page: int = Field(1, gt=0, description="Page number (1-indexed)")
     page_size: int = Field(10, gt=0, le=100, description="Number of items per page")
+    cursor: Optional[str] = Field(None, description="Opaque cursor from the previous page's next_cursor; takes precedence over page")
     sort_by: Optional[str] = None
     sort_order: Optional[str] = Field(None, pattern="^(asc|desc)$")
\ No newline at end of file
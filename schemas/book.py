@@ -1,5 +1,8 @@
-from typing import Optional, List, Set
+from typing import Optional, List
+from uuid import UUID
+import msgspec
 from sqlmodel import SQLModel, Field
+from pydantic import ConfigDict, TypeAdapter
 
 
 class CategoryBase(SQLModel):
@@ -29,7 +32,8 @@ class CategoryUpdate(SQLModel):
 
 class CategoryRead(CategoryBase):
     """Schema for category responses"""
-    id: int
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
+    id: UUID
 
 
 class BookBase(SQLModel):
@@ -47,7 +51,7 @@ class BookBase(SQLModel):
 
 class BookCreate(BookBase):
     """Schema for creating a new book"""
-    category_ids: List[int] = Field(default_factory=list)
+    category_ids: List[UUID] = Field(default_factory=list)
     
     class Config:
         json_schema_extra = {
@@ -61,7 +65,7 @@ class BookCreate(BookBase):
                 "language": "English",
                 "page_count": 412,
                 "cover_image_url": "https://example.com/covers/dune.jpg",
-                "category_ids": [1, 3]
+                "category_ids": ["0192a6f4-3c1e-7b2a-9d4e-5f6a7b8c9d01", "0192a6f4-3c1e-7b2a-9d4e-5f6a7b8c9d03"]
             }
         }
 
@@ -77,14 +81,14 @@ class BookUpdate(SQLModel):
     language: Optional[str] = None
     page_count: Optional[int] = Field(None, gt=0)
     cover_image_url: Optional[str] = None
-    category_ids: Optional[List[int]] = None
+    category_ids: Optional[List[UUID]] = None
 
 
 class BookSearchParams(SQLModel):
     """Query parameters for searching books"""
     title: Optional[str] = None
     author: Optional[str] = None
-    category_id: Optional[int] = None
+    category_id: Optional[UUID] = None
     language: Optional[str] = None
     min_publication_year: Optional[int] = Field(None, ge=0, le=2100)
     max_publication_year: Optional[int] = Field(None, ge=0, le=2100)
@@ -95,13 +99,45 @@ class BookSearchParams(SQLModel):
 
 class BookWithCategories(BookBase):
     """Schema for book responses with categories"""
-    id: int
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
+    id: UUID
     average_rating: float = 0.0
     ratings_count: int = 0
     categories: List[CategoryRead] = Field(default_factory=list)
 
 
+class CategoryReadMsg(msgspec.Struct, kw_only=True):
+    """msgspec output mirror of CategoryRead"""
+    id: UUID
+    name: str
+    description: Optional[str] = None
+
+
+class BookReadMsg(msgspec.Struct, kw_only=True):
+    """msgspec output mirror of BookWithCategories"""
+    id: UUID
+    title: str
+    author: str
+    isbn: Optional[str] = None
+    description: Optional[str] = None
+    publication_year: Optional[int] = None
+    publisher: Optional[str] = None
+    language: Optional[str] = None
+    page_count: Optional[int] = None
+    cover_image_url: Optional[str] = None
+    average_rating: float = 0.0
+    ratings_count: int = 0
+    categories: List[CategoryReadMsg] = msgspec.field(default_factory=list)
+
+
 class BooksListResponse(SQLModel):
     """Schema for returning a list of books"""
     books: List[BookWithCategories]
-    total: int
\ No newline at end of file
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+# Built once at import: serialize a list of read schemas straight to JSON bytes in
+# pydantic-core, without a *ListResponse wrapper or a per-item dict round trip
+category_list_adapter = TypeAdapter(List[CategoryRead])
+book_list_adapter = TypeAdapter(List[BookWithCategories])
\ No newline at end of file
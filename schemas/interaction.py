@@ -1,36 +1,32 @@
 from typing import Optional, Dict, List, Any
-from enum import Enum
-import json
+from uuid import UUID
+import msgspec
 from sqlmodel import SQLModel, Field
-from pydantic import validator
-from models.models import InteractionType  # Import enum from models
+from pydantic import ConfigDict, TypeAdapter, model_validator
+from models.enums import InteractionType  # Enum only; avoids importing the ORM model graph
 from schemas.book import BookWithCategories
 from schemas.user import UserRead
 
 
 class InteractionCreate(SQLModel):
     """Schema for creating a new user-book interaction"""
-    book_id: int
+    book_id: UUID
     interaction_type: InteractionType
     rating: Optional[float] = Field(None, ge=1, le=5, description="Rating value (1-5)")
     review_text: Optional[str] = None
     
-    @validator('rating')
-    def rating_required_for_rate(cls, v, values):
-        if values.get('interaction_type') == InteractionType.RATE and v is None:
+    @model_validator(mode='after')
+    def check_required_fields_for_type(self) -> 'InteractionCreate':
+        if self.interaction_type == InteractionType.RATE and self.rating is None:
             raise ValueError('Rating is required for RATE interaction type')
-        return v
-    
-    @validator('review_text')
-    def review_required_for_review(cls, v, values):
-        if values.get('interaction_type') == InteractionType.REVIEW and not v:
+        if self.interaction_type == InteractionType.REVIEW and not self.review_text:
             raise ValueError('Review text is required for REVIEW interaction type')
-        return v
+        return self
     
     class Config:
         json_schema_extra = {
             "example": {
-                "book_id": 1,
+                "book_id": "0192a6f5-8e21-7c44-a1b2-c3d4e5f60001",
                 "interaction_type": "rate",
                 "rating": 4.5,
                 "review_text": "This book was excellent, I highly recommend it."
@@ -84,15 +80,27 @@ class UserPreferenceUpdate(UserPreferenceBase):
 
 class UserPreferenceRead(UserPreferenceBase):
     """Schema for user preference responses"""
-    id: int
-    user_id: int
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
+    id: UUID
+    user_id: UUID
 
 
 class InteractionRead(SQLModel):
     """Schema for interaction responses"""
-    id: int
-    user_id: int
-    book_id: int
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
+    id: UUID
+    user_id: UUID
+    book_id: UUID
+    interaction_type: InteractionType
+    rating: Optional[float] = None
+    review_text: Optional[str] = None
+
+
+class InteractionReadMsg(msgspec.Struct, kw_only=True):
+    """msgspec output mirror of InteractionRead"""
+    id: UUID
+    user_id: UUID
+    book_id: UUID
     interaction_type: InteractionType
     rating: Optional[float] = None
     review_text: Optional[str] = None
@@ -111,4 +119,11 @@ class InteractionWithUser(InteractionRead):
 class InteractionListResponse(SQLModel):
     """Schema for returning a list of interactions"""
     interactions: List[InteractionRead]
-    total: int
\ No newline at end of file
+    total: int
+
+
+# Serializes a page of interactions straight to JSON bytes (see schemas.book)
+interaction_list_adapter = TypeAdapter(List[InteractionRead])
+# Rebuild cached pages of interactions with their embedded book or user
+interaction_with_book_list_adapter = TypeAdapter(List[InteractionWithBook])
+interaction_with_user_list_adapter = TypeAdapter(List[InteractionWithUser])
\ No newline at end of file
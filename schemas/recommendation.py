@@ -1,8 +1,10 @@
 from typing import Optional, Dict, List, Any
+from uuid import UUID
 from datetime import datetime
 from enum import Enum
+import msgspec
 from sqlmodel import SQLModel, Field
-from pydantic import validator
+from pydantic import ConfigDict, TypeAdapter
 from schemas.book import BookWithCategories
 
 
@@ -19,8 +21,8 @@ class RecommendationSource(str, Enum):
 
 class RecommendationCreate(SQLModel):
     """Schema for creating a new recommendation"""
-    user_id: int
-    book_id: int
+    user_id: UUID
+    book_id: UUID
     score: float = Field(..., ge=0, le=1, description="Recommendation confidence score (0-1)")
     reason: Optional[str] = None
     recommendation_source: RecommendationSource
@@ -29,15 +31,15 @@ class RecommendationCreate(SQLModel):
     class Config:
         json_schema_extra = {
             "example": {
-                "user_id": 1,
-                "book_id": 5,
+                "user_id": "0192a6f2-1a0b-7d3c-8e4f-a5b6c7d8e9f1",
+                "book_id": "0192a6f5-8e21-7c44-a1b2-c3d4e5f60005",
                 "score": 0.87,
                 "reason": "Based on your interest in science fiction and previous ratings",
                 "recommendation_source": "hybrid",
                 "recommendation_metadata": {
                     "similarity_score": 0.78,
                     "collaborative_score": 0.92,
-                    "matching_categories": [1, 3]
+                    "matching_categories": ["0192a6f4-3c1e-7b2a-9d4e-5f6a7b8c9d01", "0192a6f4-3c1e-7b2a-9d4e-5f6a7b8c9d03"]
                 }
             }
         }
@@ -55,9 +57,24 @@ class RecommendationUpdate(SQLModel):
 
 class RecommendationRead(SQLModel):
     """Schema for recommendation responses"""
-    id: int
-    user_id: int
-    book_id: int
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
+    id: UUID
+    user_id: UUID
+    book_id: UUID
+    score: float
+    reason: Optional[str] = None
+    is_viewed: bool
+    is_dismissed: bool
+    recommendation_source: str
+    recommendation_metadata: Optional[Dict[str, Any]] = None
+    viewed_at: Optional[datetime] = None
+
+
+class RecommendationReadMsg(msgspec.Struct, kw_only=True):
+    """msgspec output mirror of RecommendationRead"""
+    id: UUID
+    user_id: UUID
+    book_id: UUID
     score: float
     reason: Optional[str] = None
     is_viewed: bool
@@ -83,7 +100,7 @@ class RecommendationBatchRequest(SQLModel):
     count: int = Field(5, ge=1, le=20, description="Number of recommendations to generate")
     include_viewed: bool = False
     include_dismissed: bool = False
-    category_filters: Optional[List[int]] = None
+    category_filters: Optional[List[UUID]] = None
     min_score: Optional[float] = Field(None, ge=0, le=1)
     source_filters: Optional[List[RecommendationSource]] = None
     
@@ -93,7 +110,7 @@ class RecommendationBatchRequest(SQLModel):
                 "count": 5,
                 "include_viewed": False,
                 "include_dismissed": False,
-                "category_filters": [1, 3],
+                "category_filters": ["0192a6f4-3c1e-7b2a-9d4e-5f6a7b8c9d01", "0192a6f4-3c1e-7b2a-9d4e-5f6a7b8c9d03"],
                 "min_score": 0.7,
                 "source_filters": ["rag", "hybrid"]
             }
@@ -111,4 +128,8 @@ class RecommendationFeedbackRequest(SQLModel):
                 "is_helpful": True,
                 "feedback_text": "This was a great recommendation, thank you!"
             }
-        }
\ No newline at end of file
+        }
+
+
+# Serializes a page of recommendations straight to JSON bytes (see schemas.book)
+recommendation_list_adapter = TypeAdapter(List[RecommendationWithBook])
\ No newline at end of file
@@ -1,6 +1,8 @@
 from typing import Optional, List
+from uuid import UUID
+import msgspec
 from sqlmodel import SQLModel, Field
-from pydantic import EmailStr, validator
+from pydantic import ConfigDict, EmailStr, TypeAdapter, ValidationInfo, field_validator
 
 
 class UserBase(SQLModel):
@@ -42,16 +44,29 @@ class UserPasswordUpdate(SQLModel):
     new_password: str = Field(..., min_length=8)
     confirm_password: str
     
-    @validator('confirm_password')
-    def passwords_match(cls, v, values):
-        if 'new_password' in values and v != values['new_password']:
+    @field_validator('confirm_password')
+    @classmethod
+    def passwords_match(cls, v: str, info: ValidationInfo) -> str:
+        if 'new_password' in info.data and v != info.data['new_password']:
             raise ValueError('Passwords do not match')
         return v
 
 
 class UserRead(UserBase):
     """Schema for user responses, excluding sensitive data"""
-    id: int
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
+    id: UUID
+    is_active: bool = True
+    is_admin: bool = False
+
+
+class UserReadMsg(msgspec.Struct, kw_only=True):
+    """msgspec output mirror of UserRead"""
+    id: UUID
+    username: str
+    email: str
+    full_name: Optional[str] = None
+    bio: Optional[str] = None
     is_active: bool = True
     is_admin: bool = False
 
@@ -59,4 +74,8 @@ class UserRead(UserBase):
 class UsersListResponse(SQLModel):
     """Schema for returning a list of users"""
     users: List[UserRead]
-    total: int
\ No newline at end of file
+    total: int
+
+
+# Serializes a page of users straight to JSON bytes (see schemas.book)
+user_list_adapter = TypeAdapter(List[UserRead])
\ No newline at end of file
@@ -1,66 +1,214 @@
-from sqlmodel import Session, select, SQLModel
-from typing import TypeVar, Generic, Type, List, Optional, Any
+import base64
+import logging
+from datetime import datetime
+from sqlalchemy import lambda_stmt, literal, tuple_
+from redis.exceptions import RedisError
+from sqlmodel import select, update, delete, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import TypeVar, Generic, Type, List, Optional, Any, AsyncIterator, Callable, Dict, Tuple
+from uuid import UUID
 from utils.decorators.db import db_exception_handler
-from utils.decorators.cache import cached
+from utils.decorators.cache import cached, cache_get_many, cache_set_many, _delete_keys, _invalidate_tags
 from utils.cache.redis_client import get_redis_client
+from utils.exceptions.base import ValidationException
+
+logger = logging.getLogger(__name__)
 
 T = TypeVar('T', bound=SQLModel)
+S = TypeVar('S', bound=SQLModel)
+
+# model_dump / model_validate resolved once per class rather than looked up on every write
+_dump_cache: Dict[type, Callable[..., Dict[str, Any]]] = {}
+_validate_cache: Dict[type, Callable[[Any], SQLModel]] = {}
+
+
+def _dump(obj: SQLModel, **kwargs: Any) -> Dict[str, Any]:
+    cls = type(obj)
+    dump = _dump_cache.get(cls)
+    if dump is None:
+        dump = _dump_cache[cls] = cls.model_dump
+    return dump(obj, **kwargs)
+
+
+def _validate(model: Type[T], obj: Any) -> T:
+    validate = _validate_cache.get(model)
+    if validate is None:
+        validate = _validate_cache[model] = model.model_validate
+    return validate(obj)
+
+
+def to_read(schema_cls: Type[S], orm_obj: SQLModel, **values: Any) -> S:
+    """
+    Build a response schema from an ORM row without re-validating it.
+    
+    Only for rows just read through SQLModel: their values already have the
+    column types, so model_construct can skip pydantic's per-field validation.
+    Only loaded attributes are copied, so this never triggers a lazy load.
+    Client input (*Create/*Update schemas) must still be validated.
+    """
+    fields = schema_cls.model_fields
+    data = {key: value for key, value in orm_obj.__dict__.items() if key in fields}
+    data.update(values)
+    return schema_cls.model_construct(**data)
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    """Encode the (created_at, id) position of the last row on a page as an opaque cursor"""
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        created_at, id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(id)
+    except ValueError as e:
+        raise ValidationException(
+            message="Invalid pagination cursor",
+            details={"field": "cursor"},
+            original_exception=e
+        )
+
 
 class BaseService(Generic[T]):
     def __init__(self, model: Type[T]):
         self.model = model
-        self.cache = get_redis_client()  # Get Redis client for caching
+        self.cache = get_redis_client(use_async=True)  # Services are async, so use the asyncio client
         self.cache_prefix = f"{self.__class__.__name__}"  # Use class name as cache prefix
+        # Statements that never change are built once per service instead of per call
+        self._stmt_all = select(model)
+    
+    async def _mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        """Fetch many cache keys in one round trip; misses and cache errors come back as None"""
+        if self.cache is None or not keys:
+            return [None] * len(keys)
+        try:
+            return await cache_get_many(self.cache, keys)
+        except RedisError as e:
+            logger.warning(f"Cache MGET failed: {str(e)}")
+            return [None] * len(keys)
+    
+    async def _mset(self, values: Dict[str, bytes], ttl: int) -> None:
+        """Write many cache keys in one pipelined round trip"""
+        if self.cache is None or not values:
+            return
+        try:
+            await cache_set_many(self.cache, values, ttl)
+        except RedisError as e:
+            logger.warning(f"Cache pipeline write failed: {str(e)}")
+    
+    async def _invalidate(self, keys: List[str], tags: Optional[List[str]] = None) -> None:
+        """
+        Delete cache keys (or * patterns) and tagged entries for writes whose
+        keys are only known inside the method
+        """
+        if self.cache is None:
+            return
+        try:
+            await _delete_keys(self.cache, keys)
+            await _invalidate_tags(self.cache, tags or [])
+        except RedisError as e:
+            logger.error(f"Error invalidating cache: {str(e)}")
     
     @db_exception_handler
-    @cached(prefix="base_service", ttl=300)  # 5 minute default cache
-    async def get_by_id(self, db: Session, id: str) -> Optional[T]:
+    @cached(prefix="base_service", ttl=300, model=lambda self: self.model)  # 5 minute default cache
+    async def get_by_id(self, db: AsyncSession, id: UUID) -> Optional[T]:
         """Get a record by ID"""
-        return db.exec(select(self.model).where(self.model.id == id)).first()
+        model = self.model
+        # Lambda statements are cached per model: repeat calls skip building and compiling the SELECT
+        statement = lambda_stmt(lambda: select(model).where(model.id == id))
+        return (await db.exec(statement)).scalars().first()
     
     @db_exception_handler
-    @cached(prefix="base_service", ttl=300)
-    async def get_all(self, db: Session) -> List[T]:
-        """Get all records"""
-        return db.exec(select(self.model)).all()
+    @cached(prefix="base_service", ttl=300, model=lambda self: self.model)
+    async def get_all(self, db: AsyncSession, limit: int) -> List[T]:
+        """Get up to `limit` records; use stream_all to walk a whole table"""
+        return (await db.exec(self._stmt_all.limit(limit))).all()
+    
+    async def stream_all(self, db: AsyncSession, batch_size: int = 1000) -> AsyncIterator[T]:
+        """
+        Yield every record without materializing the table.
+        
+        Rows come from a server-side cursor batch_size at a time, so memory stays
+        bounded by one batch however large the table grows.
+        """
+        result = await db.stream_scalars(self._stmt_all.execution_options(yield_per=batch_size))
+        async for obj in result:
+            yield obj
     
     @db_exception_handler
-    async def create(self, db: Session, obj_in: SQLModel) -> T:
+    async def get_page(
+        self, 
+        db: AsyncSession, 
+        limit: int = 10, 
+        cursor: Optional[str] = None
+    ) -> Tuple[List[T], Optional[str]]:
+        """
+        Get records newest first using keyset pagination.
+        
+        Unlike OFFSET, the cost of a page does not grow with how deep it is: the
+        cursor becomes a (created_at, id) < (:created_at, :id) predicate served by
+        the created_at index. Returns the page and the cursor for the next one,
+        which is None on the last page.
+        """
+        order_key = tuple_(self.model.created_at, self.model.id)
+        query = select(self.model)
+        
+        if cursor:
+            query = query.where(order_key < tuple_(*decode_cursor(cursor)))
+            
+        # Fetch one extra row to learn whether another page exists without a COUNT(*)
+        rows = (await db.exec(
+            query
+            .order_by(self.model.created_at.desc(), self.model.id.desc())
+            .limit(limit + 1)
+        )).all()
+        
+        if len(rows) <= limit:
+            return rows, None
+        
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+    
+    @db_exception_handler
+    async def create(self, db: AsyncSession, obj_in: SQLModel) -> T:
         """Create a new record"""
-        db_obj = self.model.from_orm(obj_in) if not isinstance(obj_in, self.model) else obj_in
+        db_obj = _validate(self.model, obj_in) if not isinstance(obj_in, self.model) else obj_in
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         return db_obj
     
     @db_exception_handler
-    async def update(self, db: Session, id: str, obj_in: SQLModel) -> Optional[T]:
-        """Update a record"""
-        db_obj = await self.get_by_id(db, id)
-        if not db_obj:
-            return None
+    async def update(self, db: AsyncSession, id: UUID, obj_in: SQLModel) -> Optional[T]:
+        """Update a record in one UPDATE ... RETURNING round trip; None if it does not exist"""
+        obj_data = _dump(obj_in, exclude_unset=True)
+        if not obj_data:
+            return await db.get(self.model, id)
             
-        obj_data = obj_in.dict(exclude_unset=True)
-        for key, value in obj_data.items():
-            setattr(db_obj, key, value)
-            
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        db_obj = (await db.exec(
+            update(self.model)
+            .where(self.model.id == id)
+            .values(**obj_data)
+            .returning(self.model)
+        )).scalars().first()
+        await db.commit()
         return db_obj
     
     @db_exception_handler
-    async def delete(self, db: Session, id: str) -> bool:
-        """Delete a record by ID"""
-        db_obj = await self.get_by_id(db, id)
-        if db_obj:
-            db.delete(db_obj)
-            db.commit()
-            return True
-        return False
+    async def delete(self, db: AsyncSession, id: UUID) -> bool:
+        """Delete a record by ID in one DELETE ... RETURNING round trip"""
+        deleted_id = (await db.exec(
+            delete(self.model)
+            .where(self.model.id == id)
+            .returning(self.model.id)
+        )).first()
+        await db.commit()
+        return deleted_id is not None
     
     @db_exception_handler
-    async def exists(self, db: Session, id: str) -> bool:
-        """Check if a record exists by ID"""
-        result = await self.get_by_id(db, id)
-        return result is not None
\ No newline at end of file
+    async def exists(self, db: AsyncSession, id: UUID) -> bool:
+        """Check if a record exists by ID without loading the row"""
+        return (await db.exec(
+            select(literal(1)).where(self.model.id == id).limit(1)
+        )).first() is not None
\ No newline at end of file
@@ -1,10 +1,56 @@
-from sqlmodel import Session, select, col, or_
-from typing import List, Optional, Dict, Any
-from models.models import Book, Category, BookCategoryLink
-from schemas.book import BookCreate, BookUpdate, BookSearchParams
+from sqlalchemy import func
+from sqlalchemy.orm import selectinload
+from sqlmodel import select, delete, col
+from sqlmodel.ext.asyncio.session import AsyncSession
+from functools import lru_cache
+from typing import List, Optional, Dict
+from uuid import UUID
+from models.models import Book, Category, BookCategoryLink, UserBookInteraction, InteractionType
+from schemas.book import BookCreate, BookUpdate, BookSearchParams, BookWithCategories, CategoryRead, book_list_adapter, category_list_adapter
 from utils.decorators.db import db_exception_handler
-from utils.decorators.cache import cached, invalidate_cache
-from services.base import BaseService
+from utils.decorators.cache import cached, cached_background, invalidate_cache, cache_key
+from services.base import BaseService, to_read
+
+
+# Per-book category lists, cached separately from the listings that contain the book
+BOOK_CATEGORIES_TTL = 3600  # 1 hour
+
+
+def book_categories_key(book_id: UUID) -> str:
+    return f"book_service:book_categories:{book_id}"
+
+
+# Cached listings that a new or edited book can appear in
+BOOK_LISTING_KEYS = [
+    f"{cache_key('book_service', 'get_books_with_categories')}*",
+    f"{cache_key('book_service', 'search_books')}*",
+    f"{cache_key('book_service', 'get_books_by_category')}*",
+]
+
+
+def book_cache_keys(book_id: UUID) -> List[str]:
+    """Cache entries holding a single book"""
+    return [
+        cache_key("book_service", "get_book_with_categories", book_id),
+        cache_key("base_service", "get_by_id", book_id),
+        book_categories_key(book_id),
+    ]
+
+
+@lru_cache(maxsize=64)
+def books_page_statement(skip: int, limit: int):
+    """Build the book listing statement once per (skip, limit) and reuse it across calls"""
+    return (
+        select(Book)
+        .offset(skip)
+        .limit(limit)
+        .order_by(Book.title)
+    )
+
+
+def to_book_read(book: Book, categories: List[Category]) -> BookWithCategories:
+    """Build a BookWithCategories response from freshly read rows, skipping re-validation"""
+    return to_read(BookWithCategories, book, categories=[to_read(CategoryRead, c) for c in categories])
 
 
 class BookService(BaseService[Book]):
@@ -13,65 +59,111 @@ class BookService(BaseService[Book]):
         self.cache_prefix = "book_service"
     
     @db_exception_handler
-    @cached(prefix="book_service", ttl=600)  # 10 minute cache
-    async def get_books_with_categories(self, db: Session, skip: int = 0, limit: int = 100) -> List[Book]:
-        """Get books with their categories"""
-        books = db.exec(
-            select(Book)
-            .offset(skip)
-            .limit(limit)
-            .order_by(Book.title)
-        ).all()
-        
-        # Load categories for each book
-        for book in books:
-            book.categories = db.exec(
-                select(Category)
-                .join(BookCategoryLink)
-                .where(BookCategoryLink.book_id == book.id)
-            ).all()
+    @cached(prefix="book_service", ttl=600, model=book_list_adapter)  # 10 minute cache
+    async def get_books_with_categories(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> List[BookWithCategories]:
+        """
+        Get books with their categories.
+        
+        The rows were just read through SQLModel, so the responses are built with
+        to_book_read instead of being validated again field by field.
+        """
+        books = (await db.exec(books_page_statement(skip, limit))).all()
+        categories_by_book = await self._get_categories_by_book(db, [book.id for book in books])
+        
+        return [
+            to_read(BookWithCategories, book, categories=categories_by_book[book.id])
+            for book in books
+        ]
+    
+    async def _get_categories_by_book(self, db: AsyncSession, book_ids: List[UUID]) -> Dict[UUID, List[CategoryRead]]:
+        """
+        Get the categories of many books in a fixed number of round trips.
+        
+        One MGET serves the books whose categories are cached, one JOIN query loads
+        the rest, and one pipelined write backfills the cache for them.
+        """
+        cached_values = await self._mget([book_categories_key(book_id) for book_id in book_ids])
+        
+        categories_by_book = {}
+        missing = []
+        for book_id, value in zip(book_ids, cached_values):
+            if value is None:
+                missing.append(book_id)
+            else:
+                categories_by_book[book_id] = category_list_adapter.validate_json(value)
+        
+        if missing:
+            for book_id in missing:
+                categories_by_book[book_id] = []
             
-        return books
+            rows = (await db.exec(
+                select(BookCategoryLink.book_id, Category)
+                .join(Category, Category.id == BookCategoryLink.category_id)
+                .where(col(BookCategoryLink.book_id).in_(missing))
+            )).all()
+            for book_id, category in rows:
+                categories_by_book[book_id].append(to_read(CategoryRead, category))
+            
+            await self._mset(
+                {
+                    book_categories_key(book_id): category_list_adapter.dump_json(categories_by_book[book_id])
+                    for book_id in missing
+                },
+                BOOK_CATEGORIES_TTL
+            )
+        
+        return categories_by_book
     
     @db_exception_handler
-    @cached(prefix="book_service", ttl=600)
-    async def get_book_with_categories(self, db: Session, book_id: str) -> Optional[Book]:
-        """Get a single book with its categories"""
-        book = await self.get_by_id(db, book_id)
+    @cached(prefix="book_service", ttl=600, model=BookWithCategories)
+    async def get_book_with_categories(self, db: AsyncSession, book_id: UUID) -> Optional[BookWithCategories]:
+        """
+        Get a single book with its categories.
+        
+        Built with to_book_read: the rows come straight from the database, so
+        re-validating them is skipped.
+        """
+        # This result is cached itself, so read the row directly rather than through get_by_id
+        book = await db.get(Book, book_id)
         if not book:
             return None
             
-        book.categories = db.exec(
+        categories = (await db.exec(
             select(Category)
             .join(BookCategoryLink)
             .where(BookCategoryLink.book_id == book_id)
-        ).all()
+        )).all()
             
-        return book
+        return to_book_read(book, categories)
     
     @db_exception_handler
-    @cached(prefix="book_service", ttl=300)
+    @cached(prefix="book_service", ttl=300, model=book_list_adapter)
     async def search_books(
         self, 
-        db: Session, 
+        db: AsyncSession, 
         params: BookSearchParams,
         skip: int = 0, 
         limit: int = 10
-    ) -> List[Book]:
-        """Search books by various criteria"""
+    ) -> List[BookWithCategories]:
+        """
+        Search books by various criteria.
+        
+        Results are built with to_book_read, skipping re-validation of rows that
+        were just read from the database.
+        """
         query = select(Book)
         
         # Apply filters based on search parameters
+        # LIKE '%...%' is served by the pg_trgm GIN indexes on title and author;
+        # autoescape keeps % and _ in the search text literal
         if params.title:
-            query = query.where(col(Book.title).contains(params.title))
+            query = query.where(col(Book.title).contains(params.title, autoescape=True))
         
         if params.author:
-            query = query.where(col(Book.author).contains(params.author))
+            query = query.where(col(Book.author).contains(params.author, autoescape=True))
         
         if params.category_id:
-            query = query.join(BookCategoryLink).where(
-                BookCategoryLink.category_id == params.category_id
-            )
+            query = query.where(col(Book.category_ids).contains([params.category_id]))
         
         if params.language:
             query = query.where(Book.language == params.language)
@@ -94,161 +186,155 @@ class BookService(BaseService[Book]):
         # Apply pagination
         query = query.offset(skip).limit(limit).order_by(Book.title)
         
-        # Execute query
-        books = db.exec(query).all()
+        # Execute query, loading categories for all matches in one extra IN query
+        books = (await db.exec(query.options(selectinload(Book.categories)))).all()
         
-        # Load categories for each book
-        for book in books:
-            book.categories = db.exec(
-                select(Category)
-                .join(BookCategoryLink)
-                .where(BookCategoryLink.book_id == book.id)
-            ).all()
-            
-        return books
+        return [to_book_read(book, book.categories) for book in books]
     
     @db_exception_handler
-    @invalidate_cache(prefix="book_service")
-    async def create_book(self, db: Session, book_in: BookCreate) -> Book:
+    @invalidate_cache(prefix="book_service", key_builder=lambda *args, **kwargs: BOOK_LISTING_KEYS)
+    async def create_book(self, db: AsyncSession, book_in: BookCreate) -> BookWithCategories:
         """Create a new book with categories"""
-        # Create book
-        book_data = book_in.dict(exclude={"category_ids"})
-        book = Book(**book_data)
+        # Create book; the id is generated client-side, so the links go in the same flush
+        book_data = book_in.model_dump(exclude={"category_ids"})
+        book = Book(**book_data, category_ids=list(book_in.category_ids))
         db.add(book)
-        db.commit()
-        db.refresh(book)
-        
-        # Add categories
-        if book_in.category_ids:
-            for category_id in book_in.category_ids:
-                link = BookCategoryLink(book_id=book.id, category_id=category_id)
-                db.add(link)
-            
-            db.commit()
+        db.add_all([
+            BookCategoryLink(book_id=book.id, category_id=category_id)
+            for category_id in book_in.category_ids
+        ])
+        await db.commit()
+        await db.refresh(book)
             
         # Load categories
-        book.categories = db.exec(
+        categories = (await db.exec(
             select(Category)
             .join(BookCategoryLink)
             .where(BookCategoryLink.book_id == book.id)
-        ).all()
+        )).all()
         
-        return book
+        return to_book_read(book, categories)
     
     @db_exception_handler
-    @invalidate_cache(prefix="book_service")
-    async def update_book(self, db: Session, book_id: str, book_in: BookUpdate) -> Optional[Book]:
+    @invalidate_cache(prefix="book_service", key_builder=lambda self, db, book_id, *args, **kwargs: [
+        *book_cache_keys(book_id),
+        *BOOK_LISTING_KEYS,
+    ])
+    async def update_book(self, db: AsyncSession, book_id: UUID, book_in: BookUpdate) -> Optional[BookWithCategories]:
         """Update a book and its categories"""
-        book = await self.get_by_id(db, book_id)
+        # Load the row into this session, not the detached copy get_by_id may return from the cache
+        book = await db.get(Book, book_id)
         if not book:
             return None
             
         # Update book attributes
-        update_data = book_in.dict(exclude={"category_ids"}, exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(book, key, value)
+        book.sqlmodel_update(book_in.model_dump(exclude={"category_ids"}, exclude_unset=True))
         
         # Update categories if provided
         if book_in.category_ids is not None:
-            # Remove existing category links
-            db.exec(
-                select(BookCategoryLink)
-                .where(BookCategoryLink.book_id == book_id)
-            ).delete()
+            book.category_ids = list(book_in.category_ids)
+            
+            # Remove existing category links with a single bulk DELETE
+            await db.exec(delete(BookCategoryLink).where(BookCategoryLink.book_id == book_id))
             
             # Add new category links
-            for category_id in book_in.category_ids:
-                link = BookCategoryLink(book_id=book_id, category_id=category_id)
-                db.add(link)
+            db.add_all([
+                BookCategoryLink(book_id=book_id, category_id=category_id)
+                for category_id in book_in.category_ids
+            ])
         
         db.add(book)
-        db.commit()
-        db.refresh(book)
+        await db.commit()
+        await db.refresh(book)
         
         # Load categories
-        book.categories = db.exec(
+        categories = (await db.exec(
             select(Category)
             .join(BookCategoryLink)
             .where(BookCategoryLink.book_id == book.id)
-        ).all()
+        )).all()
         
-        return book
+        return to_book_read(book, categories)
     
     @db_exception_handler
-    @cached(prefix="book_service", ttl=3600)  # 1 hour cache for popular books
-    async def get_popular_books(self, db: Session, limit: int = 10) -> List[Book]:
+    @cached_background(prefix="book_service", refresh_interval=3600, model=book_list_adapter)  # Refreshed hourly, never invalidated
+    async def get_popular_books(self, db: AsyncSession, limit: int = 10) -> List[BookWithCategories]:
         """Get popular books based on ratings"""
-        books = db.exec(
+        books = (await db.exec(
             select(Book)
+            .options(selectinload(Book.categories))
             .where(Book.ratings_count > 0)
             .order_by(col(Book.average_rating).desc(), col(Book.ratings_count).desc())
             .limit(limit)
-        ).all()
-        
-        # Load categories for each book
-        for book in books:
-            book.categories = db.exec(
-                select(Category)
-                .join(BookCategoryLink)
-                .where(BookCategoryLink.book_id == book.id)
-            ).all()
-            
-        return books
+        )).all()
+        
+        return [to_book_read(book, book.categories) for book in books]
     
     @db_exception_handler
-    @cached(prefix="book_service", ttl=3600)
-    async def get_books_by_category(self, db: Session, category_id: str, limit: int = 10) -> List[Book]:
+    @cached(prefix="book_service", ttl=3600, model=book_list_adapter)
+    async def get_books_by_category(self, db: AsyncSession, category_id: UUID, limit: int = 10) -> List[BookWithCategories]:
         """Get books by category"""
-        books = db.exec(
+        books = (await db.exec(
             select(Book)
-            .join(BookCategoryLink)
-            .where(BookCategoryLink.category_id == category_id)
+            .options(selectinload(Book.categories))
+            .where(col(Book.category_ids).contains([category_id]))
             .order_by(Book.title)
             .limit(limit)
-        ).all()
-        
-        # Load all categories for each book
-        for book in books:
-            book.categories = db.exec(
-                select(Category)
-                .join(BookCategoryLink)
-                .where(BookCategoryLink.book_id == book.id)
-            ).all()
-            
-        return books
+        )).all()
+        
+        return [to_book_read(book, book.categories) for book in books]
     
     @db_exception_handler
-    @invalidate_cache(prefix="book_service", key_pattern="book_*")
-    async def update_book_ratings(self, db: Session, book_id: str) -> Optional[Book]:
-        """Update a book's average rating and rating count based on user interactions"""
-        from models.models import UserBookInteraction, InteractionType
+    async def find_similar_books(
+        self, 
+        db: AsyncSession, 
+        embedding: List[float], 
+        limit: int = 10,
+        exclude_book_id: Optional[UUID] = None
+    ) -> List[Book]:
+        """Get the books nearest to an embedding by cosine distance"""
+        query = select(Book).where(col(Book.embedding).is_not(None))
+        
+        if exclude_book_id:
+            query = query.where(Book.id != exclude_book_id)
+        
+        # Distance is computed in Postgres and served by the HNSW index
+        query = query.order_by(col(Book.embedding).cosine_distance(embedding)).limit(limit)
         
-        book = await self.get_by_id(db, book_id)
+        return (await db.exec(query)).all()
+    
+    @db_exception_handler
+    @invalidate_cache(prefix="book_service", key_builder=lambda self, db, book_id, *args, **kwargs: book_cache_keys(book_id))
+    async def update_book_ratings(self, db: AsyncSession, book_id: UUID) -> Optional[Book]:
+        """
+        Recompute a book's average rating and rating count from all of its RATE interactions.
+        
+        The values are maintained incrementally by a database trigger on
+        user_book_interactions; use this only to repair a drifted book.
+        """
+        book = await db.get(Book, book_id)
         if not book:
             return None
         
-        # Get all RATE interactions for this book
-        ratings = db.exec(
-            select(UserBookInteraction)
+        # Aggregate in Postgres: one row back instead of every rating
+        ratings_count, average_rating = (await db.exec(
+            select(
+                func.count(),
+                func.coalesce(func.avg(UserBookInteraction.rating), 0)
+            )
             .where(
                 UserBookInteraction.book_id == book_id,
                 UserBookInteraction.interaction_type == InteractionType.RATE,
-                UserBookInteraction.rating != None
+                col(UserBookInteraction.rating).is_not(None)
             )
-        ).all()
-        
-        # Calculate new average
-        if ratings:
-            total_rating = sum(r.rating for r in ratings if r.rating is not None)
-            book.ratings_count = len(ratings)
-            book.average_rating = total_rating / book.ratings_count if book.ratings_count > 0 else 0
-        else:
-            book.ratings_count = 0
-            book.average_rating = 0
+        )).one()
+        
+        book.ratings_count = ratings_count
+        book.average_rating = float(average_rating)
             
         # Save changes
         db.add(book)
-        db.commit()
-        db.refresh(book)
+        await db.commit()
+        await db.refresh(book)
         
         return book
\ No newline at end of file
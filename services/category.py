@@ -1,38 +1,58 @@
-from sqlmodel import Session, select
+from sqlalchemy import func, literal
+from sqlmodel import select, col
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Optional
+from uuid import UUID
 from models.models import Category, BookCategoryLink
-from schemas.book import CategoryCreate, CategoryUpdate
+from schemas.book import CategoryCreate, CategoryUpdate, CategoryRead, category_list_adapter
 from utils.decorators.db import db_exception_handler
-from utils.decorators.cache import cached, invalidate_cache
-from services.base import BaseService
+from utils.decorators.cache import cached, cached_background, invalidate_cache, cache_key
+from services.base import BaseService, to_read
 from utils.exceptions.base import ValidationException
 
 
+def category_cache_keys(category_id: UUID) -> List[str]:
+    """Cache entries that change when a category is edited or removed"""
+    return [
+        cache_key("base_service", "get_by_id", category_id),
+        cache_key("category_service", "get_category_book_count", category_id),
+        f"{cache_key('category_service', 'get_by_name')}*",
+        f"{cache_key('category_service', 'get_all_categories')}*",
+        # Per-book category lists embed the category's name and description
+        "book_service:book_categories:*",
+    ]
+
+
 class CategoryService(BaseService[Category]):
     def __init__(self):
         super().__init__(Category)
         self.cache_prefix = "category_service"
     
     @db_exception_handler
-    @cached(prefix="category_service", ttl=3600)  # 1 hour cache
-    async def get_by_name(self, db: Session, name: str) -> Optional[Category]:
+    @cached(prefix="category_service", ttl=3600, model=Category)  # 1 hour cache
+    async def get_by_name(self, db: AsyncSession, name: str) -> Optional[Category]:
         """Get category by name"""
-        return db.exec(select(Category).where(Category.name == name)).first()
+        return (await db.exec(select(Category).where(Category.name == name))).first()
     
     @db_exception_handler
-    @cached(prefix="category_service", ttl=3600)
-    async def get_all_categories(self, db: Session, skip: int = 0, limit: int = 100) -> List[Category]:
-        """Get all categories with pagination"""
-        return db.exec(
+    @cached(prefix="category_service", ttl=3600, model=category_list_adapter)
+    async def get_all_categories(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> List[CategoryRead]:
+        """Get all categories with pagination, built with to_read since the rows are fresh from the database"""
+        categories = (await db.exec(
             select(Category)
             .offset(skip)
             .limit(limit)
             .order_by(Category.name)
-        ).all()
+        )).all()
+        
+        return [to_read(CategoryRead, category) for category in categories]
     
     @db_exception_handler
-    @invalidate_cache(prefix="category_service")
-    async def create_category(self, db: Session, category_in: CategoryCreate) -> Category:
+    @invalidate_cache(prefix="category_service", key_builder=lambda self, db, category_in, *args, **kwargs: [
+        cache_key("category_service", "get_by_name", category_in.name),
+        f"{cache_key('category_service', 'get_all_categories')}*",
+    ])
+    async def create_category(self, db: AsyncSession, category_in: CategoryCreate) -> Category:
         """Create a new category"""
         # Check if name already exists
         existing_category = await self.get_by_name(db, category_in.name)
@@ -43,18 +63,19 @@ class CategoryService(BaseService[Category]):
             )
             
         # Create category
-        category = Category(**category_in.dict())
+        category = Category(**category_in.model_dump())
         db.add(category)
-        db.commit()
-        db.refresh(category)
+        await db.commit()
+        await db.refresh(category)
         
         return category
     
     @db_exception_handler
-    @invalidate_cache(prefix="category_service")
-    async def update_category(self, db: Session, category_id: str, category_in: CategoryUpdate) -> Optional[Category]:
+    @invalidate_cache(prefix="category_service", key_builder=lambda self, db, category_id, *args, **kwargs: category_cache_keys(category_id))
+    async def update_category(self, db: AsyncSession, category_id: UUID, category_in: CategoryUpdate) -> Optional[Category]:
         """Update a category"""
-        category = await self.get_by_id(db, category_id)
+        # Load the row into this session, not the detached copy get_by_id may return from the cache
+        category = await db.get(Category, category_id)
         if not category:
             return None
             
@@ -68,33 +89,42 @@ class CategoryService(BaseService[Category]):
                 )
                 
         # Update category attributes
-        update_data = category_in.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(category, key, value)
+        category.sqlmodel_update(category_in.model_dump(exclude_unset=True))
             
         db.add(category)
-        db.commit()
-        db.refresh(category)
+        await db.commit()
+        await db.refresh(category)
         
         return category
     
     @db_exception_handler
     @cached(prefix="category_service", ttl=3600)
-    async def get_category_book_count(self, db: Session, category_id: str) -> int:
+    async def get_category_book_count(self, db: AsyncSession, category_id: UUID) -> int:
         """Get number of books in a category"""
-        result = db.exec(
-            select(BookCategoryLink)
+        return (await db.exec(
+            select(func.count())
+            .select_from(BookCategoryLink)
             .where(BookCategoryLink.category_id == category_id)
-        ).all()
-        
-        return len(result)
+        )).one()
     
     @db_exception_handler
-    @invalidate_cache(prefix="category_service")
-    async def delete_category_if_unused(self, db: Session, category_id: str) -> bool:
+    @invalidate_cache(prefix="category_service", key_builder=lambda self, db, category_id, *args, **kwargs: category_cache_keys(category_id))
+    async def delete_category_if_unused(self, db: AsyncSession, category_id: UUID) -> bool:
         """Delete a category only if it's not used by any book"""
-        book_count = await self.get_category_book_count(db, category_id)
-        if book_count > 0:
+        # Stop at the first link instead of counting them all
+        in_use = (await db.exec(
+            select(literal(1))
+            .select_from(BookCategoryLink)
+            .where(BookCategoryLink.category_id == category_id)
+            .limit(1)
+        )).first() is not None
+        if in_use:
+            # Only the rejection pays for the full count the response reports
+            book_count = (await db.exec(
+                select(func.count())
+                .select_from(BookCategoryLink)
+                .where(BookCategoryLink.category_id == category_id)
+            )).one()
             raise ValidationException(
                 message="Cannot delete category that is used by books",
                 details={"book_count": book_count}
@@ -104,31 +134,18 @@ class CategoryService(BaseService[Category]):
         return await self.delete(db, category_id)
     
     @db_exception_handler
-    @cached(prefix="category_service", ttl=3600)
-    async def get_popular_categories(self, db: Session, limit: int = 10) -> List[Category]:
+    @cached_background(prefix="category_service", refresh_interval=3600, model=Category)  # Refreshed hourly, never invalidated
+    async def get_popular_categories(self, db: AsyncSession, limit: int = 10) -> List[Category]:
         """Get most popular categories based on book count"""
-        # Get all category IDs with their book counts
-        category_counts = {}
-        
-        # Get all book-category links
-        links = db.exec(select(BookCategoryLink)).all()
-        
-        # Count books per category
-        for link in links:
-            category_counts[link.category_id] = category_counts.get(link.category_id, 0) + 1
-            
-        # Sort by count descending
-        sorted_categories = sorted(
-            category_counts.items(), 
-            key=lambda x: x[1], 
-            reverse=True
-        )[:limit]
+        # Counted and ranked in Postgres over the (category_id, book_id) index;
+        # only the top `limit` categories come back
+        book_count = func.count(col(BookCategoryLink.book_id)).label("book_count")
+        rows = (await db.exec(
+            select(Category, book_count)
+            .join(BookCategoryLink, BookCategoryLink.category_id == Category.id)
+            .group_by(Category.id)
+            .order_by(book_count.desc())
+            .limit(limit)
+        )).all()
         
-        # Get top category objects
-        result = []
-        for category_id, _ in sorted_categories:
-            category = await self.get_by_id(db, category_id)
-            if category:
-                result.append(category)
-                
-        return result
\ No newline at end of file
+        return [category for category, _ in rows]
\ No newline at end of file
@@ -1,13 +1,55 @@
-from sqlmodel import Session, select
-from typing import List, Optional, Dict, Any
-from datetime import datetime
-from models.models import UserBookInteraction, InteractionType, Book, User
-from schemas.interaction import InteractionCreate, InteractionUpdate
+import asyncio
+import logging
+from contextlib import suppress
+from sqlalchemy import insert
+from sqlalchemy.orm import defer, selectinload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional, Dict, Any, AsyncIterator
+from uuid import UUID
+from db.engine import get_async_engine
+from models.models import UserBookInteraction, InteractionType, Book, User, generate_uuid
+from schemas.interaction import (
+    InteractionCreate, InteractionUpdate, InteractionRead, InteractionWithBook, InteractionWithUser,
+    interaction_list_adapter, interaction_with_book_list_adapter, interaction_with_user_list_adapter
+)
+from schemas.user import UserRead
 from utils.decorators.db import db_exception_handler
-from utils.decorators.cache import cached, invalidate_cache
-from services.base import BaseService
+from utils.decorators.cache import cached, cached_raw_json, invalidate_cache, cache_key
+from services.base import BaseService, to_read
+from services.book import book_cache_keys, to_book_read
 from utils.exceptions.base import ValidationException
 
+logger = logging.getLogger(__name__)
+
+# Interaction responses embed the book but never its embedding, the widest column
+# by far; raise instead of silently loading it if something does touch it
+BOOK_WITHOUT_EMBEDDING = defer(Book.embedding, raiseload=True)
+
+
+# Cached reads record the user or book whose interactions they were built from
+# (see cached(tags=...)); a write evicts exactly the entries recorded under its
+# user and book, and cached reads for everyone else stay warm.
+def user_interactions_tag(user_id: UUID) -> str:
+    return f"interactions:user:{user_id}"
+
+
+def book_interactions_tag(book_id: UUID) -> str:
+    return f"interactions:book:{book_id}"
+
+
+def interaction_tags(user_id: UUID, book_id: UUID) -> List[str]:
+    """Tags of the cached reads that can change when user_id interacts with book_id"""
+    return [user_interactions_tag(user_id), book_interactions_tag(book_id)]
+
+
+def _by_user(self, db: AsyncSession, user_id: UUID, *args: Any, **kwargs: Any) -> str:
+    return user_interactions_tag(user_id)
+
+
+def _by_book(self, db: AsyncSession, book_id: UUID, *args: Any, **kwargs: Any) -> str:
+    return book_interactions_tag(book_id)
+
 
 class InteractionService(BaseService[UserBookInteraction]):
     def __init__(self):
@@ -15,50 +57,78 @@ class InteractionService(BaseService[UserBookInteraction]):
         self.cache_prefix = "interaction_service"
     
     @db_exception_handler
-    @cached(prefix="interaction_service", ttl=300)
-    async def get_user_interactions(self, db: Session, user_id: str, limit: int = 50) -> List[UserBookInteraction]:
-        """Get interactions for a specific user"""
-        interactions = db.exec(
+    @cached(prefix="interaction_service", ttl=60, tags=_by_user, model=interaction_with_book_list_adapter)  # 1 minute: changes with every interaction the user records
+    async def get_user_interactions(self, db: AsyncSession, user_id: UUID, limit: int = 50) -> List[InteractionWithBook]:
+        """
+        Get interactions for a specific user, each with its book.
+        
+        Returned as read schemas rather than rows: a cached page cannot carry
+        loaded relationships, so both a hit and a miss embed the book.
+        """
+        # Books and their categories for the whole page come from two extra IN queries
+        interactions = (await db.exec(
             select(UserBookInteraction)
+            .options(
+                selectinload(UserBookInteraction.book)
+                .options(defer(Book.embedding, raiseload=True), selectinload(Book.categories))
+            )
             .where(UserBookInteraction.user_id == user_id)
             .order_by(UserBookInteraction.created_at.desc())
             .limit(limit)
-        ).all()
-        
-        # Load related books
-        for interaction in interactions:
-            interaction.book = db.exec(
-                select(Book).where(Book.id == interaction.book_id)
-            ).first()
-            
-        return interactions
+        )).all()
+        return [
+            to_read(InteractionWithBook, i, book=to_book_read(i.book, i.book.categories))
+            for i in interactions
+        ]
     
     @db_exception_handler
-    @cached(prefix="interaction_service", ttl=300)
-    async def get_book_interactions(self, db: Session, book_id: str, limit: int = 50) -> List[UserBookInteraction]:
-        """Get interactions for a specific book"""
-        interactions = db.exec(
+    @cached(prefix="interaction_service", ttl=300, tags=_by_book, single_flight=True, model=interaction_with_user_list_adapter)  # 5 minutes: a popular book's feed changes often
+    async def get_book_interactions(self, db: AsyncSession, book_id: UUID, limit: int = 50) -> List[InteractionWithUser]:
+        """Get interactions for a specific book, each with its user as UserRead (see get_user_interactions)"""
+        # Users for the whole page come from one extra IN query
+        interactions = (await db.exec(
             select(UserBookInteraction)
+            .options(selectinload(UserBookInteraction.user))
             .where(UserBookInteraction.book_id == book_id)
             .order_by(UserBookInteraction.created_at.desc())
             .limit(limit)
-        ).all()
+        )).all()
+        return [to_read(InteractionWithUser, i, user=to_read(UserRead, i.user)) for i in interactions]
+    
+    @db_exception_handler
+    @cached_raw_json(prefix="interaction_service", ttl=60, tags=_by_user)
+    async def get_user_interactions_json(self, db: AsyncSession, user_id: UUID, limit: int = 50) -> bytes:
+        """
+        Get a user's interactions as a ready-to-send JSON array of InteractionRead.
         
-        # Load related users
-        for interaction in interactions:
-            interaction.user = db.exec(
-                select(User).where(User.id == interaction.user_id)
-            ).first()
-            
-        return interactions
+        The encoded body itself is cached, so a hit is returned by the route with
+        no deserialization or re-encoding (see utils.responses.json_bytes_response).
+        """
+        return await self._interactions_json(db, UserBookInteraction.user_id == user_id, limit)
     
     @db_exception_handler
-    @cached(prefix="interaction_service", ttl=300)
+    @cached_raw_json(prefix="interaction_service", ttl=300, tags=_by_book)
+    async def get_book_interactions_json(self, db: AsyncSession, book_id: UUID, limit: int = 50) -> bytes:
+        """Get a book's interactions as a ready-to-send JSON array of InteractionRead"""
+        return await self._interactions_json(db, UserBookInteraction.book_id == book_id, limit)
+    
+    async def _interactions_json(self, db: AsyncSession, criterion: Any, limit: int) -> bytes:
+        # InteractionRead embeds neither book nor user, so no relationships are loaded
+        interactions = (await db.exec(
+            select(UserBookInteraction)
+            .where(criterion)
+            .order_by(UserBookInteraction.created_at.desc())
+            .limit(limit)
+        )).all()
+        return interaction_list_adapter.dump_json([to_read(InteractionRead, i) for i in interactions])
+    
+    @db_exception_handler
+    @cached(prefix="interaction_service", ttl=300, tags=_by_user, model=UserBookInteraction)  # 5 minutes, and invalidated by interaction writes
     async def get_user_book_interaction(
         self, 
-        db: Session, 
-        user_id: str, 
-        book_id: str, 
+        db: AsyncSession, 
+        user_id: UUID, 
+        book_id: UUID, 
         interaction_type: Optional[InteractionType] = None
     ) -> Optional[UserBookInteraction]:
         """Get a specific interaction between a user and a book"""
@@ -73,14 +143,14 @@ class InteractionService(BaseService[UserBookInteraction]):
         if interaction_type:
             query = query.where(UserBookInteraction.interaction_type == interaction_type)
             
-        return db.exec(query.order_by(UserBookInteraction.created_at.desc())).first()
+        return (await db.exec(query.order_by(UserBookInteraction.created_at.desc()))).first()
     
     @db_exception_handler
-    @invalidate_cache(prefix="interaction_service")
+    @invalidate_cache(prefix="interaction_service", tags=lambda self, db, user_id, interaction_in, *args, **kwargs: interaction_tags(user_id, interaction_in.book_id))
     async def create_interaction(
         self, 
-        db: Session, 
-        user_id: str, 
+        db: AsyncSession, 
+        user_id: UUID, 
         interaction_in: InteractionCreate
     ) -> UserBookInteraction:
         """Create a new interaction between a user and a book"""
@@ -99,7 +169,9 @@ class InteractionService(BaseService[UserBookInteraction]):
             )
             
         # Check if book exists
-        book = db.exec(select(Book).where(Book.id == interaction_in.book_id)).first()
+        book = (await db.exec(
+            select(Book).options(BOOK_WITHOUT_EMBEDDING).where(Book.id == interaction_in.book_id)
+        )).first()
         if not book:
             raise ValidationException(
                 message="Book not found",
@@ -107,36 +179,44 @@ class InteractionService(BaseService[UserBookInteraction]):
             )
             
         # Create interaction
-        interaction_data = interaction_in.dict()
+        interaction_data = interaction_in.model_dump()
         interaction = UserBookInteraction(**interaction_data, user_id=user_id)
         db.add(interaction)
-        db.commit()
-        db.refresh(interaction)
+        # created_at comes back from the INSERT's RETURNING clause (SQLAlchemy 2
+        # eager_defaults="auto"), so no refresh SELECT is needed after the commit
+        await db.commit()
         
-        # Update book rating if this is a RATE interaction
         if interaction.interaction_type == InteractionType.RATE:
-            book_service = None  # Import this inside method to avoid circular imports
-            from services.book import BookService
-            book_service = BookService()
-            await book_service.update_book_ratings(db, interaction.book_id)
-            
+            # The user_book_interactions trigger just changed the book's rating
+            # aggregates: reload them and drop the cached copies of the book
+            await db.refresh(book, ["average_rating", "ratings_count"])
+            await self._invalidate(book_cache_keys(book.id))
+        
         # Load related book
         interaction.book = book
         
         return interaction
     
+    def record_view(self, user_id: UUID, book_id: UUID) -> None:
+        """Record that a user viewed a book; the row is written in bulk by view_event_buffer"""
+        view_event_buffer.record(user_id, book_id)
+    
     @db_exception_handler
-    @invalidate_cache(prefix="interaction_service")
+    @invalidate_cache(
+        prefix="interaction_service",
+        key_builder=lambda self, db, interaction_id, *args, **kwargs: cache_key("base_service", "get_by_id", interaction_id),
+        tags=lambda self, db, interaction_id, user_id, *args, result=None, **kwargs: interaction_tags(result.user_id, result.book_id) if result else []
+    )
     async def update_interaction(
         self, 
-        db: Session, 
-        interaction_id: str, 
-        user_id: str,  # For authorization check
+        db: AsyncSession, 
+        interaction_id: UUID, 
+        user_id: UUID,  # For authorization check
         interaction_in: InteractionUpdate
     ) -> Optional[UserBookInteraction]:
         """Update an existing interaction"""
-        # Get existing interaction
-        interaction = await self.get_by_id(db, interaction_id)
+        # Load the row into this session, not the detached copy get_by_id may return from the cache
+        interaction = await db.get(UserBookInteraction, interaction_id)
         if not interaction:
             return None
             
@@ -161,41 +241,36 @@ class InteractionService(BaseService[UserBookInteraction]):
                 details={"field": "review_text"}
             )
             
+        was_rating = interaction.interaction_type == InteractionType.RATE
+        
         # Update interaction attributes
-        update_data = interaction_in.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(interaction, key, value)
+        interaction.sqlmodel_update(interaction_in.model_dump(exclude_unset=True))
             
-        interaction.updated_at = datetime.utcnow()
         db.add(interaction)
-        db.commit()
-        db.refresh(interaction)
+        await db.commit()
+        await db.refresh(interaction)
+        
+        # Adding, changing or removing a rating changes the book's aggregates (trigger)
+        if was_rating or interaction.interaction_type == InteractionType.RATE:
+            await self._invalidate(book_cache_keys(interaction.book_id))
         
-        # Update book rating if this is a RATE interaction
-        if interaction.interaction_type == InteractionType.RATE:
-            book_service = None  # Import this inside method to avoid circular imports
-            from services.book import BookService
-            book_service = BookService()
-            await book_service.update_book_ratings(db, interaction.book_id)
-            
         # Load related book
-        interaction.book = db.exec(
-            select(Book).where(Book.id == interaction.book_id)
-        ).first()
+        interaction.book = (await db.exec(
+            select(Book).options(BOOK_WITHOUT_EMBEDDING).where(Book.id == interaction.book_id)
+        )).first()
         
         return interaction
     
     @db_exception_handler
-    @invalidate_cache(prefix="interaction_service")
     async def delete_interaction(
         self, 
-        db: Session, 
-        interaction_id: str, 
-        user_id: str  # For authorization check
+        db: AsyncSession, 
+        interaction_id: UUID, 
+        user_id: UUID  # For authorization check
     ) -> bool:
         """Delete an interaction"""
-        # Get existing interaction
-        interaction = await self.get_by_id(db, interaction_id)
+        # Load the row into this session, not the detached copy get_by_id may return from the cache
+        interaction = await db.get(UserBookInteraction, interaction_id)
         if not interaction:
             return False
             
@@ -206,89 +281,183 @@ class InteractionService(BaseService[UserBookInteraction]):
                 details={"field": "user_id"}
             )
             
-        # Store book_id for rating update
-        book_id = interaction.book_id
-        was_rating = interaction.interaction_type == InteractionType.RATE
-        
-        # Delete the interaction
-        result = await self.delete(db, interaction_id)
-        
-        # Update book rating if this was a RATE interaction
-        if result and was_rating:
-            book_service = None  # Import this inside method to avoid circular imports
-            from services.book import BookService
-            book_service = BookService()
-            await book_service.update_book_ratings(db, book_id)
-            
-        return result
+        # Delete the interaction; the book id is only known here, so invalidate in place
+        deleted = await self.delete(db, interaction_id)
+        if deleted:
+            keys = [cache_key("base_service", "get_by_id", interaction_id)]
+            if interaction.interaction_type == InteractionType.RATE:
+                # The trigger removed the rating from the book's aggregates
+                keys.extend(book_cache_keys(interaction.book_id))
+            await self._invalidate(keys, tags=interaction_tags(interaction.user_id, interaction.book_id))
+        return deleted
     
     @db_exception_handler
-    @cached(prefix="interaction_service", ttl=3600)  # 1 hour cache
-    async def get_user_rated_books(self, db: Session, user_id: str) -> List[Book]:
-        """Get all books rated by a user"""
-        interactions = db.exec(
-            select(UserBookInteraction)
+    @cached(prefix="interaction_service", ttl=3600, tags=_by_user, model=Book)  # 1 hour cache
+    async def get_user_rated_books(self, db: AsyncSession, user_id: UUID, limit: int = 100) -> List[Book]:
+        """Get up to `limit` books rated by a user, most recent first"""
+        return (await db.exec(
+            select(Book)
+            .join(UserBookInteraction, UserBookInteraction.book_id == Book.id)
             .where(
                 UserBookInteraction.user_id == user_id,
                 UserBookInteraction.interaction_type == InteractionType.RATE
             )
-        ).all()
-        
-        book_ids = [interaction.book_id for interaction in interactions]
-        books = []
-        
-        for book_id in book_ids:
-            book = db.exec(select(Book).where(Book.id == book_id)).first()
-            if book:
-                books.append(book)
-                
-        return books
+            .order_by(UserBookInteraction.created_at.desc())
+            .limit(limit)
+        )).all()
     
     @db_exception_handler
-    @cached(prefix="interaction_service", ttl=3600)  # 1 hour cache
-    async def get_user_bookmarked_books(self, db: Session, user_id: str) -> List[Book]:
-        """Get all books bookmarked by a user"""
-        interactions = db.exec(
-            select(UserBookInteraction)
+    @cached(prefix="interaction_service", ttl=3600, tags=_by_user, model=Book)  # 1 hour cache
+    async def get_user_bookmarked_books(self, db: AsyncSession, user_id: UUID, limit: int = 100) -> List[Book]:
+        """Get up to `limit` books bookmarked by a user, most recent first"""
+        return (await db.exec(
+            select(Book)
+            .join(UserBookInteraction, UserBookInteraction.book_id == Book.id)
             .where(
                 UserBookInteraction.user_id == user_id,
                 UserBookInteraction.interaction_type == InteractionType.BOOKMARK
             )
-        ).all()
-        
-        book_ids = [interaction.book_id for interaction in interactions]
-        books = []
-        
-        for book_id in book_ids:
-            book = db.exec(select(Book).where(Book.id == book_id)).first()
-            if book:
-                books.append(book)
-                
-        return books
+            .order_by(UserBookInteraction.created_at.desc())
+            .limit(limit)
+        )).all()
     
     @db_exception_handler
-    @cached(prefix="interaction_service", ttl=1800)  # 30 minute cache
-    async def get_users_who_rated_book(self, db: Session, book_id: str, min_rating: float = 0) -> List[User]:
-        """Get all users who rated a book, optionally with a minimum rating"""
+    # Not cached: User rows carry the password hash
+    async def get_users_who_rated_book(
+        self, 
+        db: AsyncSession, 
+        book_id: UUID, 
+        min_rating: float = 0, 
+        limit: int = 100
+    ) -> List[User]:
+        """Get the `limit` most recent users who rated a book, optionally with a minimum rating"""
+        query = self._users_who_rated_book_query(book_id, min_rating)
+        return (await db.exec(query.order_by(UserBookInteraction.created_at.desc()).limit(limit))).all()
+    
+    async def stream_users_who_rated_book(
+        self, 
+        db: AsyncSession, 
+        book_id: UUID, 
+        min_rating: float = 0, 
+        batch_size: int = 500
+    ) -> AsyncIterator[User]:
+        """
+        Yield every user who rated a book without materializing them all.
+        
+        For batch jobs over popular books: rows come from a server-side cursor
+        batch_size at a time (see BaseService.stream_all).
+        """
+        query = self._users_who_rated_book_query(book_id, min_rating)
+        result = await db.stream_scalars(query.execution_options(yield_per=batch_size))
+        async for user in result:
+            yield user
+    
+    @staticmethod
+    def _users_who_rated_book_query(book_id: UUID, min_rating: float):
         query = (
-            select(UserBookInteraction)
+            select(User)
+            .join(UserBookInteraction, UserBookInteraction.user_id == User.id)
             .where(
                 UserBookInteraction.book_id == book_id,
-                UserBookInteraction.interaction_type == InteractionType.RATE
+                UserBookInteraction.interaction_type == InteractionType.RATE,
+                # Always present, so every call has the same statement shape (one
+                # prepared statement); rating is in the book/type index's INCLUDE
+                UserBookInteraction.rating >= min_rating
             )
         )
-        
-        if min_rating > 0:
-            query = query.where(UserBookInteraction.rating >= min_rating)
             
-        interactions = db.exec(query).all()
+        return query
+
+
+class ViewEventBuffer:
+    """
+    Buffers VIEW interactions in memory and writes them in bulk.
+    
+    Page views are high-volume and nobody reads their ids back, so instead of one
+    ORM insert per view they are queued and flushed with a single multi-row INSERT
+    once max_batch_size events are pending or flush_interval seconds have passed.
+    """
+    
+    def __init__(self, max_batch_size: int = 500, flush_interval: float = 0.2):
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Events taken off the queue by _run but not yet written
+        self._batch: List[Dict[str, Any]] = []
+    
+    def start(self) -> None:
+        """Start the background flush task. Call from the application lifespan."""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop the background task and flush the batch it was collecting and any events still queued."""
+        if self._task is None:
+            return
         
-        user_ids = [interaction.user_id for interaction in interactions]
-        users = []
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
         
-        for user_id in user_ids:
-            user = db.exec(select(User).where(User.id == user_id)).first()
-            if user:
-                users.append(user)
+        remaining, self._batch = self._batch, []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        await self._flush(remaining)
+    
+    def record(self, user_id: UUID, book_id: UUID) -> None:
+        """Queue a VIEW interaction without waiting for the database."""
+        if self._queue is None:
+            logger.warning("View event buffer is not running, dropping view event")
+            return
+        
+        self._queue.put_nowait({
+            "id": generate_uuid(),
+            "user_id": user_id,
+            "book_id": book_id,
+            "interaction_type": InteractionType.VIEW
+        })
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # The batch lives on the instance so that stop() can flush what was
+            # collected when the task is cancelled
+            self._batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            
+            try:
+                # Keep collecting until the batch is full or the interval has elapsed
+                while len(self._batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        self._batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
                 
-        return users
\ No newline at end of file
+                await self._flush(self._batch)
+                self._batch = []
+            except Exception as e:
+                # Keep consuming: a dead task would leave record() filling the queue forever
+                logger.error(f"View event buffer failed, dropping {len(self._batch)} view events: {str(e)}")
+                self._batch = []
+    
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        
+        try:
+            async with AsyncSession(get_async_engine()) as session:
+                await session.execute(insert(UserBookInteraction), batch)
+                await session.commit()
+            logger.debug(f"Flushed {len(batch)} view events")
+        except Exception as e:
+            logger.error(f"Failed to flush {len(batch)} view events: {str(e)}")
+
+
+# Shared buffer, started and stopped by the application lifespan
+view_event_buffer = ViewEventBuffer()
\ No newline at end of file
@@ -1,209 +1,249 @@
-from sqlmodel import Session, select
+from sqlalchemy import lambda_stmt
+from sqlmodel import select, update, col, or_
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Optional, Dict, Any
-import json
-from datetime import datetime
+from uuid import UUID
 from models.models import User, UserPreference
-from schemas.user import UserCreate, UserUpdate, UserPasswordUpdate
+from schemas.user import UserCreate, UserUpdate
 from utils.decorators.db import db_exception_handler
-from utils.decorators.cache import cached, invalidate_cache
+from utils.decorators.cache import cached, invalidate_cache, cache_key
 from services.base import BaseService
 from utils.exceptions.base import ValidationException
 
 
+def user_lookup_keys(username: Optional[str] = None, email: Optional[str] = None) -> List[str]:
+    """Negative cache entries recording that a username or email is not taken"""
+    keys = []
+    if username:
+        keys.append(cache_key("user_service", "get_by_username", username))
+    if email:
+        keys.append(cache_key("user_service", "get_by_email", email))
+    return keys
+
+
 class UserService(BaseService[User]):
     def __init__(self):
         super().__init__(User)
         self.cache_prefix = "user_service"
     
+    # User rows are never cached: they carry the password hash, which must not be written to Redis.
+    # Only "not found" is cached for username and email lookups.
+    
+    @db_exception_handler
+    async def get_by_id(self, db: AsyncSession, id: UUID) -> Optional[User]:
+        """Get a user by ID"""
+        return await db.get(User, id)
+    
     @db_exception_handler
-    @cached(prefix="user_service", ttl=300)
-    async def get_by_username(self, db: Session, username: str) -> Optional[User]:
+    @cached(prefix="user_service", negative_ttl=30, negative_only=True)  # 30s: invalidated when a user takes the name
+    async def get_by_username(self, db: AsyncSession, username: str) -> Optional[User]:
         """Get user by username"""
-        return db.exec(select(User).where(User.username == username)).first()
+        statement = lambda_stmt(lambda: select(User).where(User.username == username))
+        return (await db.exec(statement)).scalars().first()
     
     @db_exception_handler
-    @cached(prefix="user_service", ttl=300)
-    async def get_by_email(self, db: Session, email: str) -> Optional[User]:
+    @cached(prefix="user_service", negative_ttl=30, negative_only=True)  # 30s: invalidated when a user takes the email
+    async def get_by_email(self, db: AsyncSession, email: str) -> Optional[User]:
         """Get user by email"""
-        return db.exec(select(User).where(User.email == email)).first()
+        statement = lambda_stmt(lambda: select(User).where(User.email == email))
+        return (await db.exec(statement)).scalars().first()
     
-    @db_exception_handler
-    @invalidate_cache(prefix="user_service")
-    async def create_user(self, db: Session, user_in: UserCreate, hashed_password: str) -> User:
-        """Create a new user"""
-        # Check if username or email already exists
-        existing_user = await self.get_by_username(db, user_in.username)
-        if existing_user:
+    async def _check_unique(
+        self, 
+        db: AsyncSession, 
+        username: Optional[str] = None, 
+        email: Optional[str] = None
+    ) -> None:
+        """
+        Raise if another user already has this username or email.
+        
+        Both are checked in one WHERE username = ... OR email = ... query rather
+        than one lookup each; write paths skip the cache anyway.
+        """
+        conditions = []
+        if username:
+            conditions.append(User.username == username)
+        if email:
+            conditions.append(User.email == email)
+        if not conditions:
+            return
+        
+        conflicts = (await db.exec(select(User.username, User.email).where(or_(*conditions)).limit(2))).all()
+        
+        if any(conflict.username == username for conflict in conflicts):
             raise ValidationException(
                 message="Username already exists",
                 details={"field": "username"}
             )
-            
-        existing_email = await self.get_by_email(db, user_in.email)
-        if existing_email:
+        if conflicts:
             raise ValidationException(
                 message="Email already exists",
                 details={"field": "email"}
             )
+    
+    @db_exception_handler
+    # Drops the cached "not found" entries for the new username and email
+    @invalidate_cache(prefix="user_service", key_builder=lambda self, db, user_in, *args, **kwargs: user_lookup_keys(user_in.username, user_in.email))
+    async def create_user(self, db: AsyncSession, user_in: UserCreate, hashed_password: str) -> User:
+        """Create a new user"""
+        # Check if username or email already exists
+        await self._check_unique(db, user_in.username, user_in.email)
             
         # Create user
-        user_data = user_in.dict(exclude={"password"})
+        user_data = user_in.model_dump(exclude={"password"})
         user = User(**user_data, hashed_password=hashed_password)
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         
         # Create default empty preferences
         preferences = UserPreference(user_id=user.id)
         db.add(preferences)
-        db.commit()
+        await db.commit()
         
         return user
     
     @db_exception_handler
-    @invalidate_cache(prefix="user_service")
-    async def update_user(self, db: Session, user_id: str, user_in: UserUpdate) -> Optional[User]:
+    async def update_user(self, db: AsyncSession, user_id: UUID, user_in: UserUpdate) -> Optional[User]:
         """Update user"""
-        user = await self.get_by_id(db, user_id)
+        user = await db.get(User, user_id)
         if not user:
             return None
+        
+        # Nothing to write when every submitted value matches the stored one
+        changes = {
+            key: value
+            for key, value in user_in.model_dump(exclude_unset=True).items()
+            if getattr(user, key) != value
+        }
+        if not changes:
+            return user
             
-        # Check username uniqueness if changed
-        if user_in.username and user_in.username != user.username:
-            existing_user = await self.get_by_username(db, user_in.username)
-            if existing_user:
-                raise ValidationException(
-                    message="Username already exists",
-                    details={"field": "username"}
-                )
-                
-        # Check email uniqueness if changed
-        if user_in.email and user_in.email != user.email:
-            existing_email = await self.get_by_email(db, user_in.email)
-            if existing_email:
-                raise ValidationException(
-                    message="Email already exists",
-                    details={"field": "email"}
-                )
+        # Check uniqueness of whichever of username and email changed
+        await self._check_unique(
+            db,
+            username=user_in.username if user_in.username != user.username else None,
+            email=user_in.email if user_in.email != user.email else None
+        )
         
         # Update user attributes
-        update_data = user_in.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(user, key, value)
+        user.sqlmodel_update(changes)
             
-        user.updated_at = datetime.utcnow()
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
+        
+        # A new username or email may be cached as "not found"
+        await self._invalidate(user_lookup_keys(changes.get("username"), changes.get("email")))
         
         return user
     
     @db_exception_handler
-    @invalidate_cache(prefix="user_service")
     async def update_password(
         self, 
-        db: Session, 
-        user_id: str, 
+        db: AsyncSession, 
+        user_id: UUID, 
         current_password_hash: str,
         new_password_hash: str
     ) -> Optional[User]:
         """Update user password"""
-        user = await self.get_by_id(db, user_id)
-        if not user:
-            return None
+        # The current password is verified in the WHERE clause, so a correct
+        # change is a single UPDATE ... RETURNING round trip
+        user = await self._update_user_row(
+            db,
+            User.id == user_id,
+            User.hashed_password == current_password_hash,
+            hashed_password=new_password_hash
+        )
+        if user:
+            return user
             
-        # Verify current password
-        if user.hashed_password != current_password_hash:
-            raise ValidationException(
-                message="Current password is incorrect",
-                details={"field": "current_password"}
-            )
+        # No row updated: either the user does not exist or the password was wrong
+        if not await self.exists(db, user_id):
+            return None
             
-        # Update password
-        user.hashed_password = new_password_hash
-        user.updated_at = datetime.utcnow()
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-        
-        return user
+        raise ValidationException(
+            message="Current password is incorrect",
+            details={"field": "current_password"}
+        )
     
     @db_exception_handler
-    @invalidate_cache(prefix="user_service")
-    async def deactivate_user(self, db: Session, user_id: str) -> Optional[User]:
+    async def deactivate_user(self, db: AsyncSession, user_id: UUID) -> Optional[User]:
         """Deactivate a user account"""
-        user = await self.get_by_id(db, user_id)
-        if not user:
-            return None
-            
-        user.is_active = False
-        user.updated_at = datetime.utcnow()
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-        
-        return user
+        user = await self._update_user_row(db, User.id == user_id, col(User.is_active).is_(True), is_active=False)
+        # No row updated: the user is missing or already inactive, and nothing was written
+        return user or await db.get(User, user_id)
     
     @db_exception_handler
-    @invalidate_cache(prefix="user_service")
-    async def reactivate_user(self, db: Session, user_id: str) -> Optional[User]:
+    async def reactivate_user(self, db: AsyncSession, user_id: UUID) -> Optional[User]:
         """Reactivate a user account"""
-        user = await self.get_by_id(db, user_id)
-        if not user:
-            return None
-            
-        user.is_active = True
-        user.updated_at = datetime.utcnow()
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+        user = await self._update_user_row(db, User.id == user_id, col(User.is_active).is_(False), is_active=True)
+        # No row updated: the user is missing or already active, and nothing was written
+        return user or await db.get(User, user_id)
+    
+    async def _update_user_row(self, db: AsyncSession, *criteria: Any, **values: Any) -> Optional[User]:
+        """
+        Apply values to the user matching criteria in one UPDATE ... RETURNING.
         
+        updated_at is set by the column's onupdate; returns None when no row matched.
+        """
+        user = (await db.exec(
+            update(User)
+            .where(*criteria)
+            .values(**values)
+            .returning(User)
+        )).scalars().first()
+        await db.commit()
         return user
     
     @db_exception_handler
-    @cached(prefix="user_service", ttl=600)
-    async def get_user_preferences(self, db: Session, user_id: str) -> Optional[UserPreference]:
+    @cached(prefix="user_service", ttl=600, model=UserPreference)  # 10 minutes: user-edited, invalidated by update_user_preferences
+    async def get_user_preferences(self, db: AsyncSession, user_id: UUID) -> Optional[UserPreference]:
         """Get a user's preferences"""
-        preferences = db.exec(
+        preferences = (await db.exec(
             select(UserPreference).where(UserPreference.user_id == user_id)
-        ).first()
+        )).first()
         
         return preferences
     
     @db_exception_handler
-    @invalidate_cache(prefix="user_service")
+    @invalidate_cache(prefix="user_service", key_builder=lambda self, db, user_id, *args, **kwargs: cache_key("user_service", "get_user_preferences", user_id))
     async def update_user_preferences(
         self, 
-        db: Session, 
-        user_id: str, 
+        db: AsyncSession, 
+        user_id: UUID, 
         category_preferences: Optional[Dict[str, float]] = None,
         preferences_data: Optional[Dict[str, Any]] = None
     ) -> Optional[UserPreference]:
         """Update a user's preferences"""
-        # Get current preferences
-        preferences = await self.get_user_preferences(db, user_id)
+        # Load the row itself into this session: a cached get_user_preferences
+        # result is a detached copy that cannot be modified and written back
+        preferences = (await db.exec(
+            select(UserPreference).where(UserPreference.user_id == user_id)
+        )).first()
         if not preferences:
             # Create if not exists
             preferences = UserPreference(user_id=user_id)
             
         # Update category preferences if provided
         if category_preferences is not None:
-            preferences.set_category_preferences(category_preferences)
+            preferences.category_preferences = category_preferences
             
         # Update other preferences if provided
         if preferences_data:
             for key, value in preferences_data.items():
                 if key == 'custom_preferences':
-                    # Handle custom preferences separately
-                    current_custom = preferences.get_custom_preferences()
-                    current_custom.update(value)
-                    preferences.set_custom_preferences(current_custom)
+                    # Merge into a new dict so the JSONB change is tracked
+                    preferences.custom_preferences = {**(preferences.custom_preferences or {}), **value}
                 elif hasattr(preferences, key):
                     setattr(preferences, key, value)
+        
+        # Re-submitting the stored values would otherwise still cost a commit and a refresh
+        if preferences in db and not db.is_modified(preferences):
+            return preferences
                     
-        preferences.updated_at = datetime.utcnow()
         db.add(preferences)
-        db.commit()
-        db.refresh(preferences)
+        await db.commit()
+        await db.refresh(preferences)
         
         return preferences
\ No newline at end of file
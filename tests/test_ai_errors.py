@@ -0,0 +1,32 @@
+import orjson
+import pytest
+
+from utils.decorators.ai import openai_error_handler
+
+# Response bodies of the baseline handler, which built an LLMServiceException per error
+BASELINE_BODIES = {
+    "RateLimitError": (429, {
+        "error": "LLMServiceException",
+        "error_code": "OPENAI_RATE_LIMIT",
+        "message": "Error with external service LLM Service: OpenAI rate limit exceeded, please try again later",
+        "suggestion": "Try again later or reduce the frequency of requests",
+    }),
+    "AuthenticationError": (401, {
+        "error": "LLMServiceException",
+        "error_code": "OPENAI_AUTH_ERROR",
+        "message": "Error with external service LLM Service: OpenAI API authentication failed",
+        "suggestion": "Check your API key configuration",
+    }),
+}
+
+
+@pytest.mark.parametrize("error_name", sorted(BASELINE_BODIES))
+def test_fixed_openai_error_body_matches_baseline(error_name):
+    # The handler dispatches on the class name, as openai's exception classes are not imported
+    error_cls = type(error_name, (Exception,), {})
+    status_code, body = BASELINE_BODIES[error_name]
+
+    response = openai_error_handler(error_cls("upstream message"), None)
+
+    assert response.status_code == status_code
+    assert orjson.loads(response.body) == body
\ No newline at end of file
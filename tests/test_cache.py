@@ -0,0 +1,55 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+import pytest
+
+from models.models import Category
+from schemas.book import BookWithCategories, CategoryRead, book_list_adapter
+from utils.decorators.cache import _rebuild, deserialize_cache_data, serialize_cache_data
+
+
+def round_trip(model: Any, value: Any) -> Any:
+    """What a @cached(model=...) method returns on a hit for an entry stored from value"""
+    return _rebuild(model, deserialize_cache_data(serialize_cache_data(value)))
+
+
+def make_book() -> BookWithCategories:
+    category = CategoryRead(id=uuid.uuid4(), name="Fantasy", description=None)
+    return BookWithCategories(
+        id=uuid.uuid4(),
+        title="The Hobbit",
+        author="J. R. R. Tolkien",
+        average_rating=4.5,
+        ratings_count=2,
+        categories=[category],
+    )
+
+
+def test_table_model_hit_matches_miss():
+    # Timestamps come back from Postgres timezone-aware
+    created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    miss = Category(id=uuid.uuid4(), name="Fantasy", created_at=created_at, updated_at=created_at)
+    hit = round_trip(Category, miss)
+    assert type(hit) is type(miss)
+    assert hit.model_dump() == miss.model_dump()
+
+
+def test_schema_hit_matches_miss():
+    miss = make_book()
+    hit = round_trip(BookWithCategories, miss)
+    assert type(hit) is type(miss)
+    assert type(hit.categories[0]) is CategoryRead
+    assert hit == miss
+
+
+@pytest.mark.parametrize("model", [BookWithCategories, book_list_adapter])
+def test_list_hit_matches_miss(model):
+    miss = [make_book(), make_book()]
+    hit = round_trip(model, miss)
+    assert [type(item) for item in hit] == [type(item) for item in miss]
+    assert hit == miss
+
+
+def test_none_is_kept():
+    assert _rebuild(Category, None) is None
\ No newline at end of file
@@ -1,5 +1,7 @@
 import logging
-from typing import Optional, Any, Dict, Union
+import socket
+import threading
+from typing import Optional, Dict, Union
 import redis
 from redis.asyncio import Redis as AsyncRedis
 from redis.exceptions import RedisError
@@ -8,6 +10,13 @@ from utils.exceptions.caching import RedisConnectionException
 
 logger = logging.getLogger(__name__)
 
+# Probe idle connections so half-open sockets are noticed (options missing on this platform are skipped)
+_KEEPALIVE_OPTIONS = {
+    getattr(socket, option): value
+    for option, value in (("TCP_KEEPIDLE", 60), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3))
+    if hasattr(socket, option)
+}
+
 
 def create_redis_client(use_async: bool = False) -> Union[redis.Redis, AsyncRedis]:
     """
@@ -32,9 +41,23 @@ def create_redis_client(use_async: bool = False) -> Union[redis.Redis, AsyncRedi
             "decode_responses": False,  # We want bytes back for flexibility
             "socket_timeout": 5,  # 5 second timeout
             "socket_connect_timeout": 5,
-            "retry_on_timeout": True
+            "retry_on_timeout": True,
+            # Bound the client's connection pool instead of redis-py's 2**31 default
+            "max_connections": settings.redis.REDIS_POOL_SIZE,
+            "socket_keepalive": True,
+            "socket_keepalive_options": _KEEPALIVE_OPTIONS,
+            "health_check_interval": settings.redis.REDIS_HEALTH_CHECK_INTERVAL,
+            # Shows up in CLIENT LIST
+            "client_name": f"rag_book_{'async' if use_async else 'sync'}"
         }
         
+        # A co-located Redis is reached over its Unix socket, skipping the TCP stack;
+        # the pool and timeouts stay the same
+        if settings.redis.REDIS_UNIX_SOCKET_PATH:
+            for key in ("host", "port", "ssl", "socket_keepalive", "socket_keepalive_options"):
+                connection_params.pop(key)
+            connection_params["unix_socket_path"] = settings.redis.REDIS_UNIX_SOCKET_PATH
+        
         # Remove None values
         connection_params = {k: v for k, v in connection_params.items() if v is not None}
         
@@ -100,13 +123,38 @@ class RedisClient:
             return False
 
 
-# Global instances for convenience
-sync_redis = RedisClient(use_async=False)
-async_redis = RedisClient(use_async=True)
+# Process-wide clients keyed by use_async, created on first use rather than at import
+_CLIENTS: Dict[bool, RedisClient] = {}
+_CLIENTS_LOCK = threading.Lock()
 
 
 def get_redis_client(use_async: bool = False) -> Optional[Union[redis.Redis, AsyncRedis]]:
-    """Get Redis client instance based on async preference."""
-    if use_async:
-        return async_redis.get_client()
-    return sync_redis.get_client()
\ No newline at end of file
+    """Get Redis client instance based on async preference, creating it on first call."""
+    client = _CLIENTS.get(use_async)
+    if client is None:
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(use_async)
+            if client is None:
+                client = _CLIENTS[use_async] = RedisClient(use_async=use_async)
+    return client.get_client()
+
+
+async def close_redis_clients() -> None:
+    """
+    Close the shared clients and their connection pools.
+    Call on application shutdown.
+    """
+    with _CLIENTS_LOCK:
+        clients = list(_CLIENTS.values())
+        _CLIENTS.clear()
+    
+    for client in clients:
+        if client.client is None:
+            continue
+        try:
+            if client.use_async:
+                await client.client.aclose()
+            else:
+                client.client.close()
+        except RedisError as e:
+            logger.error(f"Failed to close Redis client: {str(e)}")
\ No newline at end of file
@@ -1,8 +1,15 @@
+import json
 import os
+import re
 from enum import Enum
-from typing import List, Optional, Dict, Any, Union
-from pydantic import Field, PostgresDsn, EmailStr, HttpUrl, SecretStr, model_validator
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import lru_cache
+from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from utils.fast_dotenv import read_dotenv
+
+
+# Shape check only: EmailStr would pull in email-validator for a value set once per process
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 
 
 class EnvironmentType(str, Enum):
@@ -20,35 +27,69 @@ class LogLevel(str, Enum):
     CRITICAL = "CRITICAL"
 
 
-class DatabaseSettings(BaseSettings):
+class DatabaseSettings(BaseModel):
     """Database connection settings"""
-    model_config = SettingsConfigDict(env_file=".env", extra="allow")
+    # Pool and cache fields are read from DB_-prefixed variables (their validation_alias)
+    model_config = ConfigDict(extra="allow", frozen=True, populate_by_name=True)
     
     POSTGRES_SERVER: str = Field("localhost", env="POSTGRES_SERVER")
     POSTGRES_USER: str = Field("postgres", env="POSTGRES_USER")
-    POSTGRES_PASSWORD: str = Field("postgres", env="POSTGRES_PASSWORD")
+    POSTGRES_PASSWORD: str = Field("postgres", env="POSTGRES_PASSWORD", repr=False)
     POSTGRES_DB: str = Field("rag_db", env="POSTGRES_DB")
     POSTGRES_PORT: str = Field("5432", env="POSTGRES_PORT")
     
-    # Computed connection string
-    DB_URI: Optional[str] = None
+    # Connection pool configuration
+    # Keep POOL_SIZE + MAX_OVERFLOW >= expected concurrent requests per worker
+    POOL_SIZE: int = Field(10, validation_alias="DB_POOL_SIZE")
+    MAX_OVERFLOW: int = Field(20, validation_alias="DB_MAX_OVERFLOW")
+    POOL_TIMEOUT: int = Field(30, validation_alias="DB_POOL_TIMEOUT")  # seconds to wait for a connection
+    POOL_RECYCLE: int = Field(3600, validation_alias="DB_POOL_RECYCLE")  # 1 hour
+    POOL_PRE_PING: bool = Field(True, validation_alias="DB_POOL_PRE_PING")
+    
+    # Compiled statement cache entries per engine (SQLAlchemy default is 500)
+    QUERY_CACHE_SIZE: int = Field(1200, validation_alias="DB_QUERY_CACHE_SIZE")
+    # Prepared statements kept per asyncpg connection (default 100); sized to
+    # hold every distinct query the services issue, so none are re-prepared
+    PREPARED_STATEMENT_CACHE_SIZE: int = Field(500, validation_alias="DB_PREPARED_STATEMENT_CACHE_SIZE")
     
-    @model_validator(mode='after')
-    def assemble_db_connection(self) -> 'DatabaseSettings':
-        if not self.DB_URI:
-            self.DB_URI = f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
-        return self
+    # Computed connection strings (sync for Alembic, asyncpg for the app)
+    DB_URI: Optional[str] = Field(None, repr=False)
+    ASYNC_DB_URI: Optional[str] = Field(None, repr=False)
+    
+    @model_validator(mode='before')
+    @classmethod
+    def assemble_db_connection(cls, data: Any) -> Any:
+        # Computed from the input rather than assigned afterwards: the model is frozen
+        if not isinstance(data, dict):
+            return data
+        parts = {
+            name: data.get(name, cls.model_fields[name].default)
+            for name in ("POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_SERVER", "POSTGRES_PORT", "POSTGRES_DB")
+        }
+        location = "{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}".format(**parts)
+        data = dict(data)
+        if not data.get("DB_URI"):
+            data["DB_URI"] = f"postgresql://{location}"
+        if not data.get("ASYNC_DB_URI"):
+            data["ASYNC_DB_URI"] = f"postgresql+asyncpg://{location}"
+        return data
 
 
-class RedisSettings(BaseSettings):
+class RedisSettings(BaseModel):
     """Redis cache settings"""
-    model_config = SettingsConfigDict(env_file=".env", extra="allow")
+    model_config = ConfigDict(extra="allow", frozen=True)
     
     REDIS_HOST: str = Field("localhost", env="REDIS_HOST")
     REDIS_PORT: int = Field(6379, env="REDIS_PORT")
     REDIS_DB: int = Field(0, env="REDIS_DB")
-    REDIS_PASSWORD: Optional[str] = Field(None, env="REDIS_PASSWORD")
+    REDIS_PASSWORD: Optional[str] = Field(None, env="REDIS_PASSWORD", repr=False)
     REDIS_USE_SSL: bool = Field(False, env="REDIS_USE_SSL")
+    # Connect over a Unix domain socket instead of TCP when Redis runs on the same host/pod
+    REDIS_UNIX_SOCKET_PATH: Optional[str] = Field(None, env="REDIS_UNIX_SOCKET_PATH")
+    
+    # Connection pool configuration, per client (one sync and one async per worker)
+    REDIS_POOL_SIZE: int = Field(50, env="REDIS_POOL_SIZE")
+    REDIS_HEALTH_CHECK_INTERVAL: int = Field(30, env="REDIS_HEALTH_CHECK_INTERVAL")  # seconds idle before a PING
     
     # Cache configuration
     CACHE_TTL_DEFAULT: int = Field(300, env="CACHE_TTL_DEFAULT")  # 5 minutes
@@ -57,27 +98,35 @@ class RedisSettings(BaseSettings):
     CACHE_TTL_LONG: int = Field(86400, env="CACHE_TTL_LONG")  # 24 hours
 
 
-class EmailSettings(BaseSettings):
+class EmailSettings(BaseModel):
     """Email service settings"""
-    model_config = SettingsConfigDict(env_file=".env", extra="allow")
+    model_config = ConfigDict(extra="allow", frozen=True)
     
     SMTP_HOST: str = Field("smtp.example.com", env="SMTP_HOST")
     SMTP_PORT: int = Field(587, env="SMTP_PORT")
     SMTP_USER: str = Field("user@example.com", env="SMTP_USER")
-    SMTP_PASSWORD: str = Field("password", env="SMTP_PASSWORD")
+    SMTP_PASSWORD: str = Field("password", env="SMTP_PASSWORD", repr=False)
     SMTP_TLS: bool = Field(True, env="SMTP_TLS")
     EMAIL_FROM: str = Field("noreply@example.com", env="EMAIL_FROM") 
     EMAIL_FROM_NAME: str = Field("Book Discovery Service", env="EMAIL_FROM_NAME")
     
     # Email sending frequency
     EMAIL_SEND_FREQUENCY: str = Field("weekly", env="EMAIL_SEND_FREQUENCY")
+    
+    @field_validator('EMAIL_FROM')
+    @classmethod
+    def check_email_from(cls, value: str) -> str:
+        # Runs only for a configured value, never for the default
+        if not _EMAIL_RE.match(value):
+            raise ValueError(f"EMAIL_FROM is not a valid email address: {value!r}")
+        return value
 
 
-class LLMSettings(BaseSettings):
+class LLMSettings(BaseModel):
     """LLM service settings"""
-    model_config = SettingsConfigDict(env_file=".env", extra="allow")
+    model_config = ConfigDict(extra="allow", frozen=True)
     
-    OPENAI_API_KEY: str = Field("", env="OPENAI_API_KEY")
+    OPENAI_API_KEY: str = Field("", env="OPENAI_API_KEY", repr=False)
     OPENAI_ORG_ID: Optional[str] = Field(None, env="OPENAI_ORG_ID")
     DEFAULT_MODEL: str = Field("gpt-3.5-turbo", env="DEFAULT_MODEL")
     
@@ -87,37 +136,44 @@ class LLMSettings(BaseSettings):
     VECTOR_STORE_PATH: str = Field("./vector_store", env="VECTOR_STORE_PATH")
 
 
-class SearchSettings(BaseSettings):
+class SearchSettings(BaseModel):
     """Web search service settings"""
-    model_config = SettingsConfigDict(env_file=".env", extra="allow")
+    model_config = ConfigDict(extra="allow", frozen=True)
     
     SEARCH_ENGINE: str = Field("duckduckgo", env="SEARCH_ENGINE")
-    GOOGLE_API_KEY: Optional[str] = Field(None, env="GOOGLE_API_KEY")
+    GOOGLE_API_KEY: Optional[str] = Field(None, env="GOOGLE_API_KEY", repr=False)
     GOOGLE_CSE_ID: Optional[str] = Field(None, env="GOOGLE_CSE_ID")
-    SERPER_API_KEY: Optional[str] = Field(None, env="SERPER_API_KEY")
+    SERPER_API_KEY: Optional[str] = Field(None, env="SERPER_API_KEY", repr=False)
 
 
-class SecuritySettings(BaseSettings):
+class SecuritySettings(BaseModel):
     """Security and authentication settings"""
-    model_config = SettingsConfigDict(env_file=".env", extra="allow")
+    model_config = ConfigDict(extra="allow", frozen=True)
     
-    SECRET_KEY: str = Field("your-secret-key-change-in-production", env="SECRET_KEY")
+    SECRET_KEY: str = Field("your-secret-key-change-in-production", env="SECRET_KEY", repr=False)
     ALGORITHM: str = Field("HS256", env="ALGORITHM")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
     
     # CORS settings
     CORS_ORIGINS: List[str] = Field(["http://localhost:3000"], env="CORS_ORIGINS")
     
-    @model_validator(mode='after')
-    def assemble_cors_origins(self) -> 'SecuritySettings':
-        if isinstance(self.CORS_ORIGINS, str) and not self.CORS_ORIGINS.startswith("["):
-            self.CORS_ORIGINS = [i.strip() for i in self.CORS_ORIGINS.split(",")]
-        return self
+    @field_validator('CORS_ORIGINS', mode='before')
+    @classmethod
+    def assemble_cors_origins(cls, value: Any) -> Any:
+        # Already a list (passed in code): nothing to parse
+        if value.__class__ is list:
+            return value
+        # From the environment the value is a string: a JSON list or comma-separated
+        if isinstance(value, str):
+            if value.startswith("["):
+                return json.loads(value)
+            return [origin for i in value.split(",") if (origin := i.strip())]
+        return value
 
 
-class LoggingSettings(BaseSettings):
+class LoggingSettings(BaseModel):
     """Logging configuration"""
-    model_config = SettingsConfigDict(env_file=".env", extra="allow")
+    model_config = ConfigDict(extra="allow", frozen=True)
     
     LOG_LEVEL: LogLevel = Field(LogLevel.INFO, env="LOG_LEVEL")
     LOG_TO_FILE: bool = Field(True, env="LOG_TO_FILE")
@@ -126,9 +182,9 @@ class LoggingSettings(BaseSettings):
     REDACT_SENSITIVE_DATA: bool = Field(True, env="REDACT_SENSITIVE_DATA")
 
 
-class AppSettings(BaseSettings):
+class AppSettings(BaseModel):
     """Application-specific settings"""
-    model_config = SettingsConfigDict(env_file=".env", extra="allow")
+    model_config = ConfigDict(extra="allow", frozen=True)
     
     PROJECT_NAME: str = Field("Book Discovery Service", env="PROJECT_NAME")
     VERSION: str = Field("0.1.0", env="VERSION")
@@ -145,24 +201,88 @@ class AppSettings(BaseSettings):
     DEFAULT_SEARCH_LIMIT: int = Field(10, env="DEFAULT_SEARCH_LIMIT")
 
 
-class Settings(BaseSettings):
-    """Main settings container that includes all sub-settings"""
-    model_config = SettingsConfigDict(env_file=".env", extra="allow")
+class Settings:
+    """
+    Main settings container that includes all sub-settings.
+    
+    Each sub-settings object is validated on first access and then stored on
+    the instance, so a process that only touches settings.db never builds the
+    other seven. Slots leave the instance without a __dict__; each child slot
+    stays empty until its first access, which falls through to __getattr__.
+    """
+    __slots__ = ("_env", "app", "db", "redis", "email", "llm", "search", "security", "logging")
+    
+    app: AppSettings
+    db: DatabaseSettings
+    redis: RedisSettings
+    email: EmailSettings
+    llm: LLMSettings
+    search: SearchSettings
+    security: SecuritySettings
+    logging: LoggingSettings
+    
+    def __init__(self, env: Dict[str, str]):
+        self._env = env
     
-    app: AppSettings = Field(default_factory=AppSettings)
-    db: DatabaseSettings = Field(default_factory=DatabaseSettings)
-    redis: RedisSettings = Field(default_factory=RedisSettings)
-    email: EmailSettings = Field(default_factory=EmailSettings)
-    llm: LLMSettings = Field(default_factory=LLMSettings)
-    search: SearchSettings = Field(default_factory=SearchSettings)
-    security: SecuritySettings = Field(default_factory=SecuritySettings)
-    logging: LoggingSettings = Field(default_factory=LoggingSettings)
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not set yet, i.e. the first access of each child
+        settings_cls = _CHILDREN.get(name)
+        if settings_cls is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        value = _from_env(settings_cls, self._env)
+        setattr(self, name, value)
+        return value
 
 
-# Create global settings instance
-settings = Settings()
+_CHILDREN: Dict[str, type] = {
+    "app": AppSettings,
+    "db": DatabaseSettings,
+    "redis": RedisSettings,
+    "email": EmailSettings,
+    "llm": LLMSettings,
+    "search": SearchSettings,
+    "security": SecuritySettings,
+    "logging": LoggingSettings,
+}
 
 
+def _read_env(env_file: str = ".env") -> Dict[str, str]:
+    """
+    Parse the .env file once, with the process environment taking precedence.
+    
+    Keys are upper-cased to match the field names case-insensitively, as
+    pydantic-settings does.
+    """
+    env = {**read_dotenv(env_file), **os.environ}
+    return {key.upper(): value for key, value in env.items()}
+
+
+def _from_env(settings_cls: type, env: Dict[str, str]) -> BaseModel:
+    """
+    Build a sub-settings object from the values already read by _read_env.
+    
+    The classes are plain validated models: get_settings supplies every value,
+    so pydantic-settings' per-instance source resolution is not needed. A field
+    with a string validation_alias is read from that variable instead of its name.
+    """
+    values = {}
+    for name, field in settings_cls.model_fields.items():
+        key = field.validation_alias if isinstance(field.validation_alias, str) else name
+        if key in env:
+            values[name] = env[key]
+    return settings_cls(**values)
+
+
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Return settings instance for dependency injection"""
-    return settings
\ No newline at end of file
+    """Return the settings instance, built on first call; also usable as a FastAPI dependency"""
+    # One read of .env shared by every sub-settings, instead of one per class
+    return Settings(_read_env())
+
+
+def __getattr__(name: str) -> Any:
+    # `from utils.config import settings` resolves here, so the settings (and the
+    # .env read behind them) are only built when first used, not on import
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
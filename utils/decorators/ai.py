@@ -1,14 +1,14 @@
 import functools
+import inspect
 import logging
 import traceback
-from typing import Callable, Optional, Dict, Any, Type, Union
+from typing import Callable, Optional, Dict, Any, Tuple, Type, Union
 from fastapi import Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from utils.exceptions.processing import (
     ProcessingException,
     RAGException,
-    ContentGenerationException,
-    RecommendationException
+    ContentGenerationException
 )
 from utils.exceptions.service import (
     ExternalServiceException,
@@ -19,6 +19,94 @@ from utils.exceptions.service import (
 # Setup logger
 logger = logging.getLogger(__name__)
 
+# (exception class, attribute) for the type-specific fields of error payloads
+_EXTRA_FIELDS = (
+    (RAGException, "stage"),
+    (ContentGenerationException, "content_type"),
+    (LLMServiceException, "model"),
+)
+
+
+@functools.lru_cache(maxsize=128)
+def _extra_fields(exc_cls: type) -> tuple:
+    """Type-specific attributes that apply to an exception class, computed once per class"""
+    return tuple(attr for base, attr in _EXTRA_FIELDS if issubclass(exc_cls, base))
+
+
+def _build_error_payload(exc: Union[ProcessingException, ExternalServiceException]) -> Dict[str, Any]:
+    """
+    Build the error fields shared by the response and the log record of an AI exception.
+    
+    Reads the exception's attributes directly instead of going through
+    to_dict, so each consumer builds a single dict.
+    """
+    payload = {
+        "error": exc.__class__.__name__,
+        "error_code": exc.error_code or "AI_PROCESSING_ERROR",
+        "message": exc.message
+    }
+    
+    if exc.details:
+        payload["details"] = exc.details
+    
+    if exc.suggestion:
+        payload["suggestion"] = exc.suggestion
+    
+    # Add more specific fields based on exception type
+    for attr in _extra_fields(type(exc)):
+        value = getattr(exc, attr, None)
+        if value is not None:
+            payload[attr] = value
+    
+    return payload
+
+
+# Exceptions that are already AI exceptions and only need logging and a response
+_AI_EXCEPTIONS = (ProcessingException, LLMServiceException, WebSearchException)
+
+
+def _handler_finder(custom_handlers: Dict[Type[Exception], Callable]) -> Callable[[type], Optional[Callable]]:
+    """
+    Build the custom handler lookup for one decorated function.
+    
+    A class resolves to the handler registered for the nearest class in its
+    MRO, so the most specific handler wins regardless of registration order.
+    The result is remembered per exception class: in steady state finding a
+    handler, or finding there is none, is a single dict lookup.
+    """
+    handlers = dict(custom_handlers)
+    resolved: Dict[type, Optional[Callable]] = {}
+    
+    def find_handler(exc_cls: type) -> Optional[Callable]:
+        if exc_cls not in resolved:
+            resolved[exc_cls] = next((handlers[cls] for cls in exc_cls.__mro__ if cls in handlers), None)
+        return resolved[exc_cls]
+    
+    return find_handler
+
+
+def _request_parameter(func: Callable) -> Tuple[Optional[int], str]:
+    """
+    Position and name of func's Request parameter, read once from its signature.
+    
+    The position is None when the request can only be passed by keyword; a
+    function without one falls back to a 'request' keyword argument.
+    """
+    for index, (name, param) in enumerate(inspect.signature(func).parameters.items()):
+        if param.annotation in (Request, "Request") or name == "request":
+            positional = param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD)
+            return (index if positional else None), name
+    return None, "request"
+
+
+# Frames kept in response tracebacks; LangChain call chains run 30+ deep
+TRACEBACK_LIMIT = 20
+
+
+# Shared request info for exceptions raised outside a request; never mutated
+_EMPTY_REQUEST_INFO: Dict[str, Any] = {}
+
+
 def ai_exception_handler(
     func: Optional[Callable] = None,
     include_traceback: bool = False,
@@ -46,74 +134,49 @@ def ai_exception_handler(
         async def get_recommendations(user_id: int):
             # AI/RAG operations here
     """
-    custom_handlers = custom_handlers or {}
+    find_handler = _handler_finder(custom_handlers or {})
     
     def decorator(func):
-        @functools.wraps(func)
-        async def async_wrapper(*args, **kwargs):
-            # Extract request if present in args or kwargs
-            request = next((arg for arg in args if isinstance(arg, Request)), 
-                         kwargs.get('request'))
+        request_index, request_name = _request_parameter(func)
+        
+        # Determine if the function is async, an async generator (streaming) or sync,
+        # and build only that wrapper; coroutine functions have no __await__, only
+        # the coroutines they return do
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                # Extract request if present in args or kwargs
+                request = args[request_index] if request_index is not None and request_index < len(args) else kwargs.get(request_name)
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as exc:
+                    return _handle_ai_exception(exc, request, include_traceback, find_handler)
             
-            try:
-                return await func(*args, **kwargs)
-            except ProcessingException as exc:
-                log_ai_exception(exc, request)
-                return create_ai_exception_response(exc, include_traceback)
-            except LLMServiceException as exc:
-                log_ai_exception(exc, request)
-                return create_ai_exception_response(exc, include_traceback)
-            except WebSearchException as exc:
-                log_ai_exception(exc, request)
-                return create_ai_exception_response(exc, include_traceback)
-            except Exception as exc:
-                # Check if we have a custom handler for this exception type
-                for exc_type, handler in custom_handlers.items():
-                    if isinstance(exc, exc_type):
-                        return handler(exc, request)
-                
-                # If no custom handler, wrap in ProcessingException
-                wrapped_exc = ProcessingException(
-                    message=f"AI processing error: {str(exc)}",
-                    original_exception=exc
-                )
-                log_ai_exception(wrapped_exc, request)
-                return create_ai_exception_response(wrapped_exc, include_traceback)
+            return async_wrapper
+        
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def async_gen_wrapper(*args, **kwargs):
+                # Extract request if present in args or kwargs
+                request = args[request_index] if request_index is not None and request_index < len(args) else kwargs.get(request_name)
+                # Errors raised mid-stream end the stream with the error response as its last item
+                try:
+                    async for item in func(*args, **kwargs):
+                        yield item
+                except Exception as exc:
+                    yield _handle_ai_exception(exc, request, include_traceback, find_handler)
+            
+            return async_gen_wrapper
         
         @functools.wraps(func)
         def sync_wrapper(*args, **kwargs):
             # Extract request if present in args or kwargs
-            request = next((arg for arg in args if isinstance(arg, Request)), 
-                         kwargs.get('request'))
-            
+            request = args[request_index] if request_index is not None and request_index < len(args) else kwargs.get(request_name)
             try:
                 return func(*args, **kwargs)
-            except ProcessingException as exc:
-                log_ai_exception(exc, request)
-                return create_ai_exception_response(exc, include_traceback)
-            except LLMServiceException as exc:
-                log_ai_exception(exc, request)
-                return create_ai_exception_response(exc, include_traceback)
-            except WebSearchException as exc:
-                log_ai_exception(exc, request)
-                return create_ai_exception_response(exc, include_traceback)
             except Exception as exc:
-                # Check if we have a custom handler for this exception type
-                for exc_type, handler in custom_handlers.items():
-                    if isinstance(exc, exc_type):
-                        return handler(exc, request)
-                
-                # If no custom handler, wrap in ProcessingException
-                wrapped_exc = ProcessingException(
-                    message=f"AI processing error: {str(exc)}",
-                    original_exception=exc
-                )
-                log_ai_exception(wrapped_exc, request)
-                return create_ai_exception_response(wrapped_exc, include_traceback)
+                return _handle_ai_exception(exc, request, include_traceback, find_handler)
         
-        # Determine if the function is async or sync
-        if callable(getattr(func, "__await__", None)):
-            return async_wrapper
         return sync_wrapper
     
     # This allows the decorator to be used with or without arguments
@@ -122,42 +185,59 @@ def ai_exception_handler(
     return decorator
 
 
+def _handle_ai_exception(
+    exc: Exception,
+    request: Optional[Request],
+    include_traceback: bool,
+    find_handler: Callable[[type], Optional[Callable[[Exception, Request], JSONResponse]]]
+) -> Union[JSONResponse, Dict[str, Any]]:
+    """Turn an exception caught by ai_exception_handler into its response; shared by every wrapper"""
+    if not isinstance(exc, _AI_EXCEPTIONS):
+        # Check if we have a custom handler for this exception type
+        handler = find_handler(type(exc))
+        if handler is not None:
+            return handler(exc, request)
+        
+        # If no custom handler, wrap in ProcessingException
+        exc = ProcessingException(
+            message=f"AI processing error: {str(exc)}",
+            original_exception=exc
+        )
+    
+    log_ai_exception(exc, request)
+    return create_ai_exception_response(exc, include_traceback)
+
+
 def log_ai_exception(exc: Union[ProcessingException, ExternalServiceException], request: Optional[Request] = None) -> None:
     """Log AI exception with appropriate context"""
-    request_info = {}
-    if request:
-        request_info = {
-            "method": request.method,
-            "url": str(request.url),
-            "client": request.client.host if request.client else "unknown",
-            "path_params": dict(request.path_params) if hasattr(request, 'path_params') else {},
-            "query_params": dict(request.query_params) if hasattr(request, 'query_params') else {}
-        }
-    
-    error_data = exc.to_dict()
-    error_data["request"] = request_info
-    
-    # Add RAG-specific details if available
-    if isinstance(exc, RAGException) and hasattr(exc, 'stage'):
-        error_data['rag_stage'] = exc.stage
-    
-    # Add content generation details if available
-    if isinstance(exc, ContentGenerationException) and hasattr(exc, 'content_type'):
-        error_data['content_type'] = exc.content_type
-    
-    # Add LLM service details if available
-    if isinstance(exc, LLMServiceException) and hasattr(exc, 'model'):
-        error_data['llm_model'] = exc.model
-    
-    # Add recommendation details if available
-    if isinstance(exc, RecommendationException) and hasattr(exc, 'user_id'):
-        error_data['recommendation_user_id'] = exc.user_id
-    
     # Determine log level based on severity
     log_level = logging.ERROR
     if isinstance(exc, (RAGException, LLMServiceException)) and exc.http_status_code and exc.http_status_code < 500:
         log_level = logging.WARNING
     
+    # Skip building the record (URL, params, exception dict) when it would be filtered out
+    if not logger.isEnabledFor(log_level):
+        return
+    
+    request_info = {
+        "method": request.method,
+        "url": str(request.url),
+        "client": request.client.host if request.client else "unknown",
+        "path_params": dict(request.path_params),
+        "query_params": dict(request.query_params)
+    } if request else _EMPTY_REQUEST_INFO
+    
+    error_data = _build_error_payload(exc)
+    
+    # Context that only the log record carries
+    if exc.http_status_code:
+        error_data["http_status_code"] = exc.http_status_code
+    if exc.source:
+        error_data["source"] = exc.source
+    if exc.original_exception:
+        error_data["original_exception"] = str(exc.original_exception)
+    error_data["request"] = request_info
+    
     logger.log(log_level, f"AI Exception: {exc.__class__.__name__}", 
                extra={"ai_error_data": error_data})
 
@@ -174,41 +254,26 @@ def create_ai_exception_response(
         include_traceback: Whether to include traceback in the response
         
     Returns:
-        JSONResponse if in an API context, Dict if in a LangChain/RAG context
+        ORJSONResponse if in an API context, Dict if in a LangChain/RAG context
     """
     status_code = getattr(exc, 'http_status_code', 500)
     
     # Determine if we're in an API context based on status_code type
     is_api_context = isinstance(status_code, int)
     
-    response_data = {
-        "error": exc.__class__.__name__,
-        "error_code": exc.error_code or "AI_PROCESSING_ERROR",
-        "message": exc.message
-    }
+    response_data = _build_error_payload(exc)
     
-    if hasattr(exc, 'details') and exc.details:
-        response_data["details"] = exc.details
-    
-    if hasattr(exc, 'suggestion') and exc.suggestion:
-        response_data["suggestion"] = exc.suggestion
-        
-    # Add more specific fields based on exception type
-    if isinstance(exc, RAGException) and hasattr(exc, 'stage'):
-        response_data["stage"] = exc.stage
-        
-    if isinstance(exc, ContentGenerationException) and hasattr(exc, 'content_type'):
-        response_data["content_type"] = exc.content_type
-        
-    if isinstance(exc, LLMServiceException) and hasattr(exc, 'model'):
-        response_data["model"] = exc.model
-    
-    if include_traceback and exc.original_exception:
-        response_data["traceback"] = traceback.format_exc()
+    if include_traceback and exc.original_exception is not None:
+        # Format the wrapped exception's own traceback: format_exc reads sys.exc_info(),
+        # which no longer points at it once a handler has dispatched; deep chains are capped
+        original = exc.original_exception
+        response_data["traceback"] = "".join(traceback.format_exception(
+            type(original), original, original.__traceback__, limit=TRACEBACK_LIMIT
+        ))
     
     # Return appropriate response type
     if is_api_context:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status_code,
             content=response_data
         )
@@ -218,48 +283,71 @@ def create_ai_exception_response(
         return {"error": response_data}
 
 
+# OpenAI errors whose content never varies; these are the ones that repeat in
+# bursts (rate limits, a revoked key), so their response bodies are built once
+_RATE_LIMIT_ERROR = {
+    "message": "OpenAI rate limit exceeded, please try again later",
+    "error_code": "OPENAI_RATE_LIMIT",
+    "http_status_code": 429,
+    "suggestion": "Try again later or reduce the frequency of requests"
+}
+_AUTH_ERROR = {
+    "message": "OpenAI API authentication failed",
+    "error_code": "OPENAI_AUTH_ERROR",
+    "http_status_code": 401,
+    "suggestion": "Check your API key configuration"
+}
+# Built from the exception itself, so the body is what create_ai_exception_response returns
+_RATE_LIMIT_BODY = _build_error_payload(LLMServiceException(**_RATE_LIMIT_ERROR))
+_AUTH_ERROR_BODY = _build_error_payload(LLMServiceException(**_AUTH_ERROR))
+
+
+def _fixed_error_response(exc: Exception, request: Request, error: Dict[str, Any], body: Dict[str, Any]) -> JSONResponse:
+    """Log an OpenAI error with fixed content and return its prebuilt response"""
+    # The exception object is only needed for the log record
+    if logger.isEnabledFor(logging.WARNING):
+        log_ai_exception(LLMServiceException(**error, original_exception=exc), request)
+    return ORJSONResponse(status_code=error["http_status_code"], content=body)
+
+
+def _invalid_request_error(exc: Exception, request: Request) -> JSONResponse:
+    """Handle invalid requests"""
+    wrapped_exc = LLMServiceException(
+        message=f"Invalid request to OpenAI API: {str(exc)}",
+        error_code="OPENAI_INVALID_REQUEST",
+        http_status_code=400,
+        original_exception=exc
+    )
+    log_ai_exception(wrapped_exc, request)
+    return create_ai_exception_response(wrapped_exc)
+
+
+def _generic_openai_error(exc: Exception, request: Request) -> JSONResponse:
+    """Handle any other OpenAI error"""
+    wrapped_exc = LLMServiceException(
+        message=f"OpenAI API error: {str(exc)}",
+        error_code="OPENAI_API_ERROR",
+        original_exception=exc
+    )
+    log_ai_exception(wrapped_exc, request)
+    return create_ai_exception_response(wrapped_exc)
+
+
+# OpenAI error class name -> handler; BadRequestError is the openai>=1.0 name of InvalidRequestError
+_OPENAI_ERROR_HANDLERS: Dict[str, Callable[[Exception, Request], JSONResponse]] = {
+    "RateLimitError": functools.partial(_fixed_error_response, error=_RATE_LIMIT_ERROR, body=_RATE_LIMIT_BODY),
+    "InvalidRequestError": _invalid_request_error,
+    "BadRequestError": _invalid_request_error,
+    "AuthenticationError": functools.partial(_fixed_error_response, error=_AUTH_ERROR, body=_AUTH_ERROR_BODY),
+}
+
+
 # Custom handler for OpenAI errors (can be expanded with providers)
 def openai_error_handler(exc: Exception, request: Request) -> JSONResponse:
     """Custom handler for OpenAI-specific errors"""
-    # Check for different OpenAI error types
-    error_type = type(exc).__name__
-    
-    if "RateLimitError" in error_type:
-        # Handle rate limiting
-        wrapped_exc = LLMServiceException(
-            message="OpenAI rate limit exceeded, please try again later",
-            error_code="OPENAI_RATE_LIMIT",
-            http_status_code=429,
-            suggestion="Try again later or reduce the frequency of requests",
-            original_exception=exc
-        )
-    elif "InvalidRequestError" in error_type:
-        # Handle invalid requests
-        wrapped_exc = LLMServiceException(
-            message=f"Invalid request to OpenAI API: {str(exc)}",
-            error_code="OPENAI_INVALID_REQUEST",
-            http_status_code=400,
-            original_exception=exc
-        )
-    elif "AuthenticationError" in error_type:
-        # Handle authentication issues
-        wrapped_exc = LLMServiceException(
-            message="OpenAI API authentication failed",
-            error_code="OPENAI_AUTH_ERROR",
-            http_status_code=401,
-            suggestion="Check your API key configuration",
-            original_exception=exc
-        )
-    else:
-        # Generic OpenAI error
-        wrapped_exc = LLMServiceException(
-            message=f"OpenAI API error: {str(exc)}",
-            error_code="OPENAI_API_ERROR",
-            original_exception=exc
-        )
-    
-    log_ai_exception(wrapped_exc, request)
-    return create_ai_exception_response(wrapped_exc)
+    # One dict lookup on the exact class name instead of a substring test per error type
+    handler = _OPENAI_ERROR_HANDLERS.get(type(exc).__name__, _generic_openai_error)
+    return handler(exc, request)
 
 
 # Initialize logging
@@ -1,7 +1,8 @@
 import functools
+import inspect
 import logging
 import traceback
-from typing import Callable, Optional, Dict, Any, Type, Union
+from typing import Callable, Optional, Dict, Tuple, Type, Union
 from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
@@ -18,6 +19,37 @@ from utils.exceptions.api import (
 # Setup logger
 logger = logging.getLogger(__name__)
 
+def _find_handler(custom_handlers: Dict[Type[Exception], Callable], exc_cls: type) -> Optional[Callable]:
+    """
+    Find the custom handler for an exception class.
+    
+    An exact match is one dict lookup; otherwise the class's MRO is walked and
+    the nearest registered base wins, instead of isinstance against every handler.
+    """
+    handler = custom_handlers.get(exc_cls)
+    if handler is not None:
+        return handler
+    for cls in exc_cls.__mro__[1:]:
+        handler = custom_handlers.get(cls)
+        if handler is not None:
+            return handler
+    return None
+
+
+def _request_parameter(func: Callable) -> Tuple[Optional[int], str]:
+    """
+    Position and name of func's Request parameter, read once from its signature.
+    
+    The position is None when the request can only be passed by keyword; a
+    function without one falls back to a 'request' keyword argument.
+    """
+    for index, (name, param) in enumerate(inspect.signature(func).parameters.items()):
+        if param.annotation in (Request, "Request") or name == "request":
+            positional = param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD)
+            return (index if positional else None), name
+    return None, "request"
+
+
 def api_exception_handler(
     func: Optional[Callable] = None,
     include_traceback: bool = False,
@@ -48,11 +80,14 @@ def api_exception_handler(
     custom_handlers = custom_handlers or {}
     
     def decorator(func):
+        request_index, request_name = _request_parameter(func)
+        
         @functools.wraps(func)
         async def async_wrapper(*args, **kwargs):
-            # Extract request if present in args or kwargs
-            request = next((arg for arg in args if isinstance(arg, Request)), 
-                         kwargs.get('request'))
+            # Extract request if present in kwargs (how FastAPI passes it) or args
+            request = kwargs.get(request_name)
+            if request is None and request_index is not None and request_index < len(args):
+                request = args[request_index]
             
             try:
                 return await func(*args, **kwargs)
@@ -67,9 +102,9 @@ def api_exception_handler(
                 return create_api_exception_response(custom_exc, include_traceback)
             except RequestValidationError as exc:
                 # FastAPI's RequestValidationError
-                for exc_type, handler in custom_handlers.items():
-                    if isinstance(exc, exc_type):
-                        return handler(exc, request)
+                handler = _find_handler(custom_handlers, type(exc))
+                if handler is not None:
+                    return handler(exc, request)
                 # Default validation error handling
                 custom_exc = BadRequestException(
                     message="Validation error in request data",
@@ -87,9 +122,9 @@ def api_exception_handler(
                 return create_api_exception_response(custom_exc, include_traceback)
             except Exception as exc:
                 # Check if we have a custom handler for this exception type
-                for exc_type, handler in custom_handlers.items():
-                    if isinstance(exc, exc_type):
-                        return handler(exc, request)
+                handler = _find_handler(custom_handlers, type(exc))
+                if handler is not None:
+                    return handler(exc, request)
                 
                 # For any other exception, we re-raise to let other handlers catch it
                 # This allows chaining multiple exception handlers (e.g., DB then API)
@@ -97,9 +132,10 @@ def api_exception_handler(
         
         @functools.wraps(func)
         def sync_wrapper(*args, **kwargs):
-            # Extract request if present in args or kwargs
-            request = next((arg for arg in args if isinstance(arg, Request)), 
-                         kwargs.get('request'))
+            # Extract request if present in kwargs (how FastAPI passes it) or args
+            request = kwargs.get(request_name)
+            if request is None and request_index is not None and request_index < len(args):
+                request = args[request_index]
             
             try:
                 return func(*args, **kwargs)
@@ -114,9 +150,9 @@ def api_exception_handler(
                 return create_api_exception_response(custom_exc, include_traceback)
             except RequestValidationError as exc:
                 # FastAPI's RequestValidationError
-                for exc_type, handler in custom_handlers.items():
-                    if isinstance(exc, exc_type):
-                        return handler(exc, request)
+                handler = _find_handler(custom_handlers, type(exc))
+                if handler is not None:
+                    return handler(exc, request)
                 # Default validation error handling
                 custom_exc = BadRequestException(
                     message="Validation error in request data",
@@ -134,16 +170,17 @@ def api_exception_handler(
                 return create_api_exception_response(custom_exc, include_traceback)
             except Exception as exc:
                 # Check if we have a custom handler for this exception type
-                for exc_type, handler in custom_handlers.items():
-                    if isinstance(exc, exc_type):
-                        return handler(exc, request)
+                handler = _find_handler(custom_handlers, type(exc))
+                if handler is not None:
+                    return handler(exc, request)
                 
                 # For any other exception, we re-raise to let other handlers catch it
                 # This allows chaining multiple exception handlers (e.g., DB then API)
                 raise
         
-        # Determine if the function is async or sync
-        if callable(getattr(func, "__await__", None)):
+        # Determine if the function is async or sync, once at decoration time;
+        # coroutine functions have no __await__, only the coroutines they return do
+        if inspect.iscoroutinefunction(func):
             return async_wrapper
         return sync_wrapper
     
@@ -155,26 +192,31 @@ def api_exception_handler(
 
 def log_api_exception(exc: APIException, request: Optional[Request] = None) -> None:
     """Log API exception with appropriate context"""
+    # Determine log level based on status code
+    log_level = logging.ERROR
+    if exc.http_status_code and 400 <= exc.http_status_code < 500:
+        # 4xx errors are warnings, not critical errors
+        log_level = logging.WARNING
+    
+    # Skip building the record (URL, headers, params, exception dict) when it would be filtered out
+    if not logger.isEnabledFor(log_level):
+        return
+    
     request_info = {}
     if request:
+        # Starlette requests always carry path_params and query_params
         request_info = {
             "method": request.method,
             "url": str(request.url),
             "client": request.client.host if request.client else "unknown",
-            "headers": {k: v for k, v in request.headers.items() if k.lower() not in ('authorization', 'cookie')},
-            "path_params": dict(request.path_params) if hasattr(request, 'path_params') else {},
-            "query_params": dict(request.query_params) if hasattr(request, 'query_params') else {}
+            "headers": dict((k, v) for k, v in request.headers.items() if k.lower() not in ('authorization', 'cookie')),
+            "path_params": dict(request.path_params),
+            "query_params": dict(request.query_params)
         }
     
     error_data = exc.to_dict()
     error_data["request"] = request_info
     
-    # Determine log level based on status code
-    log_level = logging.ERROR
-    if exc.http_status_code and 400 <= exc.http_status_code < 500:
-        # 4xx errors are warnings, not critical errors
-        log_level = logging.WARNING
-        
     logger.log(log_level, f"API Exception: {exc.__class__.__name__}", 
               extra={"api_error_data": error_data})
 
@@ -1,12 +1,20 @@
+import asyncio
 import functools
-import json
 import logging
 import time
 import inspect
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union, cast
+import uuid
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 import hashlib
+import orjson
+from pydantic import BaseModel, TypeAdapter
 from redis.asyncio import Redis as AsyncRedis
 from redis import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from db.engine import get_session
 from utils.exceptions.caching import CacheException, CacheSerializationException
 
 logger = logging.getLogger(__name__)
@@ -21,6 +29,11 @@ def generate_cache_key(
     """
     Generate a consistent cache key based on function name and arguments.
     
+    The arguments are streamed into a BLAKE2b hasher, so every key is
+    "prefix:func_name:<digest>" (or "prefix:func_name" without arguments)
+    whatever their size, and no intermediate strings are joined. Keys are
+    not readable in Redis, but "prefix:func_name*" still matches every call.
+    
     Args:
         prefix: Prefix for the cache key (usually service name)
         func_name: Name of the function being cached
@@ -30,41 +43,212 @@ def generate_cache_key(
     Returns:
         A string cache key
     """
-    # Convert args to a list of strings
-    args_str = [str(arg) for arg in args]
+    hash_obj = hashlib.blake2b(digest_size=16)
+    hashed = False
+    
+    # The database session differs per request and must not be part of the key;
+    # each component is terminated so ("ab", "c") and ("a", "bc") differ
+    for arg in args:
+        if not isinstance(arg, (Session, AsyncSession)):
+            hash_obj.update(str(arg).encode())
+            hash_obj.update(b"\x00")
+            hashed = True
+    
+    for k in sorted(kwargs):
+        hash_obj.update(f"{k}={kwargs[k]}".encode())
+        hash_obj.update(b"\x00")
+        hashed = True
     
-    # Convert kwargs to a sorted list of key-value pairs
-    kwargs_str = [f"{k}:{v}" for k, v in sorted(kwargs.items())]
+    if not hashed:
+        return f"{prefix}:{func_name}"
+    return f"{prefix}:{func_name}:{hash_obj.hexdigest()}"
+
+
+def _bind_call(signature: inspect.Signature, args: Tuple, kwargs: Dict[str, Any]) -> Tuple[Tuple, Dict[str, Any]]:
+    """
+    Normalize a method call (arguments after self) to its positional form.
+    
+    Arguments that can be passed positionally are moved out of kwargs, so
+    f(db, book_id=x) and f(db, x) get the same cache key and reach key builders
+    and tag functions the same way. Defaults are not filled in.
+    """
+    if not kwargs:
+        return args, kwargs
+    try:
+        bound = signature.bind(None, *args, **kwargs)
+    except TypeError:
+        # The call itself will raise
+        return args, kwargs
+    return bound.args[1:], bound.kwargs
+
+
+def cache_key(prefix: str, func_name: str, *args: Any) -> str:
+    """
+    Build the key a @cached method stores its result under.
     
-    # Combine all components
-    key_components = [prefix, func_name] + args_str + kwargs_str
+    Calls are normalized to their positional form (see _bind_call), so this
+    matches however the caller spelled the arguments.
     
-    # Join with colons and create hash for potentially large keys
-    key_base = ":".join(key_components)
+    Used by invalidate_cache key builders to target single entries, e.g.
+    cache_key("book_service", "get_book_with_categories", book_id).
+    Append "*" to match every cached call of a method, whatever its arguments.
+    """
+    return generate_cache_key(prefix, func_name, args, {})
+
+
+# Keys examined per SCAN call: fewer round trips over a large keyspace
+SCAN_COUNT = 1000
+# Matched keys removed per UNLINK call
+UNLINK_BATCH_SIZE = 500
+
+
+async def _delete_keys(cache_client: Union[Redis, AsyncRedis], keys: List[str]) -> None:
+    """
+    Delete exact keys and, for keys containing *, every key matching the pattern.
     
-    # Use hash for potentially large keys
-    if len(key_base) > 200:
-        hash_obj = hashlib.md5(key_base.encode())
-        return f"{prefix}:{func_name}:hash:{hash_obj.hexdigest()}"
+    Uses UNLINK, which frees the values off Redis' main thread, and removes
+    pattern matches in batches of UNLINK_BATCH_SIZE; scan_iter keeps track of
+    the cursor.
+    """
+    for key in keys:
+        if '*' in key:
+            batch = []
+            async for matched in cache_client.scan_iter(match=key, count=SCAN_COUNT):
+                batch.append(matched)
+                if len(batch) >= UNLINK_BATCH_SIZE:
+                    await cache_client.unlink(*batch)
+                    batch.clear()
+            if batch:
+                await cache_client.unlink(*batch)
+            logger.debug(f"Invalidated cache keys matching: {key}")
+        else:
+            await cache_client.unlink(key)
+            logger.debug(f"Invalidated cache key: {key}")
+
+
+def _delete_keys_sync(cache_client: Redis, keys: List[str]) -> None:
+    """Synchronous counterpart of _delete_keys"""
+    for key in keys:
+        if '*' in key:
+            batch = []
+            for matched in cache_client.scan_iter(match=key, count=SCAN_COUNT):
+                batch.append(matched)
+                if len(batch) >= UNLINK_BATCH_SIZE:
+                    cache_client.unlink(*batch)
+                    batch.clear()
+            if batch:
+                cache_client.unlink(*batch)
+            logger.debug(f"Invalidated cache keys matching: {key}")
+        else:
+            cache_client.unlink(key)
+            logger.debug(f"Invalidated cache key: {key}")
+
+
+def dependency_key(tag: str) -> str:
+    """Redis set listing the cache keys that depend on tag (e.g. "interactions:user:<id>")"""
+    return f"deps:{tag}"
+
+
+def _as_list(value: Union[str, List[str]]) -> List[str]:
+    return [value] if isinstance(value, str) else value
+
+
+async def _invalidate_tags(cache_client: AsyncRedis, tags: List[str]) -> None:
+    """
+    Delete every cache entry recorded under the tags, and the tag sets themselves.
     
-    return key_base
+    Costs two round trips however large the keyspace is, unlike a SCAN over a pattern.
+    """
+    if not tags:
+        return
+    dep_keys = [dependency_key(tag) for tag in tags]
+    async with cache_client.pipeline(transaction=False) as pipe:
+        for dep_key in dep_keys:
+            pipe.smembers(dep_key)
+        members = await pipe.execute()
+    keys = {key for keys in members for key in keys}
+    await cache_client.unlink(*keys, *dep_keys)
+    logger.debug(f"Invalidated {len(keys)} cache keys tagged: {', '.join(tags)}")
+
+
+def _invalidate_tags_sync(cache_client: Redis, tags: List[str]) -> None:
+    """Synchronous counterpart of _invalidate_tags"""
+    if not tags:
+        return
+    dep_keys = [dependency_key(tag) for tag in tags]
+    with cache_client.pipeline(transaction=False) as pipe:
+        for dep_key in dep_keys:
+            pipe.smembers(dep_key)
+        members = pipe.execute()
+    keys = {key for keys in members for key in keys}
+    cache_client.unlink(*keys, *dep_keys)
+    logger.debug(f"Invalidated {len(keys)} cache keys tagged: {', '.join(tags)}")
+
+
+def _queue_store(pipe, cache_key: str, ttl: int, value: bytes, tags: List[str]) -> None:
+    """Queue SETEX of an entry and its registration under each tag on a pipeline"""
+    pipe.setex(cache_key, ttl, value)
+    for tag in tags:
+        dep_key = dependency_key(tag)
+        pipe.sadd(dep_key, cache_key)
+        # A tag set must live as long as its longest-lived entry (NX: new set, GT: longer TTL)
+        pipe.expire(dep_key, ttl, nx=True)
+        pipe.expire(dep_key, ttl, gt=True)
 
 
-def serialize_cache_data(data: Any) -> str:
+async def cache_get_many(cache_client: AsyncRedis, keys: List[str]) -> List[Optional[bytes]]:
+    """Fetch many keys with one MGET; misses come back as None, in key order"""
+    if not keys:
+        return []
+    return await cache_client.mget(keys)
+
+
+async def cache_set_many(cache_client: AsyncRedis, values: Dict[str, bytes], ttl: int) -> None:
+    """Store many keys with one pipelined round trip (no MULTI/EXEC)"""
+    if not values:
+        return
+    async with cache_client.pipeline(transaction=False) as pipe:
+        for key, value in values.items():
+            pipe.set(key, value, ex=ttl)
+        await pipe.execute()
+
+
+# First byte of every entry written by serialize_cache_data. Bump it when the
+# payload format changes: entries in an older format are then treated as misses
+# and rewritten instead of being misread.
+CACHE_FORMAT_VERSION = b"\x01"
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC  # pgvector embeddings are numpy arrays
+
+# Stored by @cached(negative_ttl=...) when the function returned None; never a valid versioned payload
+NEGATIVE_CACHE_ENTRY = b"\x00NULL"
+
+
+def _encode_default(obj: Any) -> Any:
+    """orjson fallback for types it does not encode natively (models and ORM rows)"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def serialize_cache_data(data: Any) -> bytes:
     """
     Serialize data for caching.
     
+    Uses orjson, which encodes datetimes, UUIDs, enums and numpy arrays natively;
+    pydantic and SQLModel objects are stored as their model_dump(). The payload
+    is prefixed with CACHE_FORMAT_VERSION.
+    
     Args:
         data: The data to serialize
         
     Returns:
-        JSON string representation of the data
+        Versioned JSON bytes representation of the data
         
     Raises:
         CacheSerializationException: If serialization fails
     """
     try:
-        return json.dumps(data)
+        return CACHE_FORMAT_VERSION + orjson.dumps(data, default=_encode_default, option=_ORJSON_OPTIONS)
     except (TypeError, ValueError, OverflowError) as e:
         raise CacheSerializationException(
             message=f"Failed to serialize data for cache: {str(e)}",
@@ -73,22 +257,28 @@ def serialize_cache_data(data: Any) -> str:
         )
 
 
-def deserialize_cache_data(data_str: str) -> Any:
+def deserialize_cache_data(data: bytes) -> Any:
     """
     Deserialize data from cache.
     
     Args:
-        data_str: The serialized data string
+        data: The serialized JSON bytes, as returned by Redis
         
     Returns:
         Deserialized data
         
     Raises:
-        CacheSerializationException: If deserialization fails
+        CacheSerializationException: If deserialization fails or the entry was
+            written in another format version
     """
+    if data[:1] != CACHE_FORMAT_VERSION:
+        raise CacheSerializationException(
+            message="Cache entry has an unknown format version",
+            operation="deserialize"
+        )
     try:
-        return json.loads(data_str)
-    except (json.JSONDecodeError, TypeError) as e:
+        return orjson.loads(memoryview(data)[1:])
+    except (orjson.JSONDecodeError, TypeError) as e:
         raise CacheSerializationException(
             message=f"Failed to deserialize data from cache: {str(e)}",
             operation="deserialize",
@@ -96,18 +286,99 @@ def deserialize_cache_data(data_str: str) -> Any:
         )
 
 
+# Single flight: the lock for each cache key currently being computed in this worker
+_inflight: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+_MISS = object()
+
+SINGLE_FLIGHT_LOCK_MS = 5000  # A crashed holder blocks other workers at most this long
+SINGLE_FLIGHT_POLL_DELAYS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.4, 0.8, 1.6, 3.2)
+
+# Delete the lock only if this caller still holds it, so an expired lock
+# taken over by another worker is not released early
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+async def _peek(cache_client: AsyncRedis, cache_key: str) -> Any:
+    """Read an entry, treating errors as misses: _MISS, None for a negative entry, or the value"""
+    try:
+        cached_data = await cache_client.get(cache_key)
+        if cached_data == NEGATIVE_CACHE_ENTRY:
+            return None
+        if cached_data:
+            return deserialize_cache_data(cached_data)
+    except Exception as e:
+        logger.warning(f"Cache error for key: {cache_key}: {str(e)}")
+    return _MISS
+
+
+async def _wait_for_entry(cache_client: AsyncRedis, cache_key: str) -> Any:
+    """Poll with exponential backoff for an entry another worker is computing"""
+    for delay in SINGLE_FLIGHT_POLL_DELAYS:
+        await asyncio.sleep(delay)
+        value = await _peek(cache_client, cache_key)
+        if value is not _MISS:
+            return value
+    return _MISS
+
+
+def _rebuild(model: Optional[Union[type, TypeAdapter]], value: Any) -> Any:
+    """Turn a cached payload back into model instances: a row, a list of rows or None"""
+    if model is None or value is None:
+        return value
+    if isinstance(model, TypeAdapter):
+        return model.validate_python(value)
+    if isinstance(value, list):
+        return [model.model_validate(item) for item in value]
+    return model.model_validate(value)
+
+
 def cached(
     prefix: str,
     ttl: int = 300,  # Default TTL: 5 minutes
-    key_builder: Optional[Callable] = None
+    key_builder: Optional[Callable] = None,
+    sliding: bool = False,
+    tags: Optional[Callable] = None,
+    negative_ttl: Optional[int] = None,
+    single_flight: bool = False,
+    model: Optional[Union[type, TypeAdapter, Callable[[Any], type]]] = None,
+    negative_only: bool = False
 ):
     """
     Decorator for caching function results in Redis.
     
+    Concurrent misses for the same key within a worker are coalesced: the
+    first caller computes the value and the others wait for it.
+    
     Args:
         prefix: Prefix for the cache key
         ttl: Time to live in seconds
         key_builder: Optional custom function to generate cache keys
+        sliding: Reset the TTL on every hit, so hot entries stay cached. The GET
+            and EXPIRE go out in one pipelined round trip. Only use it for
+            entries that are invalidated on write.
+        tags: Optional function taking the call's arguments and returning the
+            tags the result depends on. Each stored entry is recorded in a
+            Redis set per tag, so invalidate_cache(tags=...) deletes exactly
+            these entries.
+        negative_ttl: When set, a None result is cached as well, for this many
+            seconds, so repeated lookups of missing rows stop reaching the
+            database. Writes that create the row must invalidate the key.
+        single_flight: Also coalesce misses across workers with a short Redis
+            lock (SET NX PX). Workers that lose the race poll for the winner's
+            entry instead of querying the database. Use it for hot keys.
+        model: Model class (or a function of self returning it) that the
+            method returns, alone or in a list, or a TypeAdapter for the whole
+            return type. Entries are stored as model_dump() dicts; with model
+            set, a hit is rebuilt with model_validate (validate_python for an
+            adapter) so hits and misses return the same type. Hits are
+            detached from any session: write paths must load rows with db.get.
+        negative_only: With negative_ttl, cache only the None results and never
+            store a found value, for rows that must not be written to Redis.
         
     Returns:
         Decorated function
@@ -117,9 +388,15 @@ def cached(
         async def get_user(self, user_id: int) -> User:
             # Function implementation
     """
+    def model_of(self) -> Optional[type]:
+        return model if model is None or isinstance(model, (type, TypeAdapter)) else model(self)
+    
     def decorator(func):
+        signature = inspect.signature(func)
+        
         @functools.wraps(func)
         async def async_wrapper(self, *args, **kwargs):
+            args, kwargs = _bind_call(signature, args, kwargs)
             # Skip caching if cache client is not available
             if not hasattr(self, "cache") or self.cache is None:
                 return await func(self, *args, **kwargs)
@@ -136,31 +413,93 @@ def cached(
             
             # Try to get from cache
             try:
-                cached_data = await cache_client.get(cache_key)
+                if sliding:
+                    async with cache_client.pipeline(transaction=False) as pipe:
+                        cached_data, _ = await pipe.get(cache_key).expire(cache_key, ttl).execute()
+                else:
+                    cached_data = await cache_client.get(cache_key)
+                if cached_data == NEGATIVE_CACHE_ENTRY:
+                    logger.debug(f"Negative cache hit for key: {cache_key}")
+                    if sliding:
+                        # The pipelined EXPIRE above applied the positive TTL; restore the short one
+                        await cache_client.expire(cache_key, negative_ttl)
+                    return None
                 if cached_data:
                     logger.debug(f"Cache hit for key: {cache_key}")
-                    return deserialize_cache_data(cached_data.decode())
-                
-                logger.debug(f"Cache miss for key: {cache_key}")
-                # Execute function and cache result
-                result = await func(self, *args, **kwargs)
-                
-                # Only cache non-None results
-                if result is not None:
-                    serialized_result = serialize_cache_data(result)
-                    await cache_client.setex(cache_key, ttl, serialized_result)
-                
-                return result
+                    return _rebuild(model_of(self), deserialize_cache_data(cached_data))
             except CacheException:
-                # Log and continue with function execution on cache error
-                logger.warning(f"Cache error for key: {cache_key}, executing function directly")
-                return await func(self, *args, **kwargs)
+                # Unreadable entry (e.g. an older format): recompute and overwrite it below
+                logger.warning(f"Cache error for key: {cache_key}, recomputing entry")
             except Exception as e:
                 logger.error(f"Unexpected error in cached decorator: {str(e)}")
                 return await func(self, *args, **kwargs)
+            
+            logger.debug(f"Cache miss for key: {cache_key}")
+            
+            async def compute():
+                # Execute function once; a failure to store the result must not run it again
+                result = await func(self, *args, **kwargs)
+                
+                # None is only cached when negative caching is enabled
+                if (result is None and negative_ttl) or (result is not None and not negative_only):
+                    try:
+                        if result is None:
+                            serialized_result, entry_ttl = NEGATIVE_CACHE_ENTRY, negative_ttl
+                        else:
+                            serialized_result, entry_ttl = serialize_cache_data(result), ttl
+                        if tags:
+                            async with cache_client.pipeline(transaction=False) as pipe:
+                                _queue_store(pipe, cache_key, entry_ttl, serialized_result, _as_list(tags(self, *args, **kwargs)))
+                                await pipe.execute()
+                        else:
+                            await cache_client.setex(cache_key, entry_ttl, serialized_result)
+                    except CacheException:
+                        logger.warning(f"Could not cache result for key: {cache_key}")
+                    except Exception as e:
+                        logger.error(f"Unexpected error in cached decorator: {str(e)}")
+                
+                return result
+            
+            lock = _inflight.get(cache_key)
+            if lock is None:
+                lock = _inflight[cache_key] = asyncio.Lock()
+            waited = lock.locked()
+            
+            async with lock:
+                if waited:
+                    # Another caller in this worker just computed the entry
+                    value = await _peek(cache_client, cache_key)
+                    if value is not _MISS:
+                        return _rebuild(model_of(self), value)
+                
+                if not single_flight:
+                    return await compute()
+                
+                lock_key, token = f"cache:lock:{cache_key}", uuid.uuid4().hex
+                try:
+                    acquired = await cache_client.set(lock_key, token, nx=True, px=SINGLE_FLIGHT_LOCK_MS)
+                except Exception as e:
+                    logger.warning(f"Could not take single-flight lock for key: {cache_key}: {str(e)}")
+                    return await compute()
+                
+                if not acquired:
+                    value = await _wait_for_entry(cache_client, cache_key)
+                    if value is not _MISS:
+                        return _rebuild(model_of(self), value)
+                    # The holder is slow or gone; compute without the lock
+                    return await compute()
+                
+                try:
+                    return await compute()
+                finally:
+                    try:
+                        await cache_client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                    except Exception as e:
+                        logger.warning(f"Could not release single-flight lock for key: {cache_key}: {str(e)}")
         
         @functools.wraps(func)
         def sync_wrapper(self, *args, **kwargs):
+            args, kwargs = _bind_call(signature, args, kwargs)
             # Skip caching if cache client is not available
             if not hasattr(self, "cache") or self.cache is None:
                 return func(self, *args, **kwargs)
@@ -177,28 +516,50 @@ def cached(
             
             # Try to get from cache
             try:
-                cached_data = cache_client.get(cache_key)
+                if sliding:
+                    with cache_client.pipeline(transaction=False) as pipe:
+                        cached_data, _ = pipe.get(cache_key).expire(cache_key, ttl).execute()
+                else:
+                    cached_data = cache_client.get(cache_key)
+                if cached_data == NEGATIVE_CACHE_ENTRY:
+                    logger.debug(f"Negative cache hit for key: {cache_key}")
+                    if sliding:
+                        # The pipelined EXPIRE above applied the positive TTL; restore the short one
+                        cache_client.expire(cache_key, negative_ttl)
+                    return None
                 if cached_data:
                     logger.debug(f"Cache hit for key: {cache_key}")
-                    return deserialize_cache_data(cached_data.decode())
-                
-                logger.debug(f"Cache miss for key: {cache_key}")
-                # Execute function and cache result
-                result = func(self, *args, **kwargs)
-                
-                # Only cache non-None results
-                if result is not None:
-                    serialized_result = serialize_cache_data(result)
-                    cache_client.setex(cache_key, ttl, serialized_result)
-                
-                return result
+                    return _rebuild(model_of(self), deserialize_cache_data(cached_data))
             except CacheException:
-                # Log and continue with function execution on cache error
-                logger.warning(f"Cache error for key: {cache_key}, executing function directly")
-                return func(self, *args, **kwargs)
+                # Unreadable entry (e.g. an older format): recompute and overwrite it below
+                logger.warning(f"Cache error for key: {cache_key}, recomputing entry")
             except Exception as e:
                 logger.error(f"Unexpected error in cached decorator: {str(e)}")
                 return func(self, *args, **kwargs)
+            
+            logger.debug(f"Cache miss for key: {cache_key}")
+            # Execute function once; a failure to store the result must not run it again
+            result = func(self, *args, **kwargs)
+            
+            # None is only cached when negative caching is enabled
+            if (result is None and negative_ttl) or (result is not None and not negative_only):
+                try:
+                    if result is None:
+                        serialized_result, entry_ttl = NEGATIVE_CACHE_ENTRY, negative_ttl
+                    else:
+                        serialized_result, entry_ttl = serialize_cache_data(result), ttl
+                    if tags:
+                        with cache_client.pipeline(transaction=False) as pipe:
+                            _queue_store(pipe, cache_key, entry_ttl, serialized_result, _as_list(tags(self, *args, **kwargs)))
+                            pipe.execute()
+                    else:
+                        cache_client.setex(cache_key, entry_ttl, serialized_result)
+                except CacheException:
+                    logger.warning(f"Could not cache result for key: {cache_key}")
+                except Exception as e:
+                    logger.error(f"Unexpected error in cached decorator: {str(e)}")
+            
+            return result
         
         # Determine if the function is async or sync
         if inspect.iscoroutinefunction(func):
@@ -208,10 +569,169 @@ def cached(
     return decorator
 
 
+def cached_raw_json(
+    prefix: str,
+    ttl: int = 300,  # Default TTL: 5 minutes
+    tags: Optional[Callable] = None
+):
+    """
+    Cache a method that returns a finished JSON response body as bytes.
+    
+    The bytes are stored and returned untouched: a hit costs one GET and no
+    deserialization, and the route sends them as-is (utils.responses.json_bytes_response).
+    
+    Args:
+        prefix: Prefix for the cache key
+        ttl: Time to live in seconds
+        tags: Optional dependency tags for invalidate_cache(tags=...), as in cached
+        
+    Returns:
+        Decorated function
+    
+    Example:
+        @cached_raw_json("interaction_service", ttl=60)
+        async def get_user_interactions_json(self, db: AsyncSession, user_id: UUID) -> bytes:
+            return interaction_list_adapter.dump_json(...)
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        
+        @functools.wraps(func)
+        async def async_wrapper(self, *args, **kwargs):
+            args, kwargs = _bind_call(signature, args, kwargs)
+            cache_client = getattr(self, "cache", None)
+            if not isinstance(cache_client, AsyncRedis):
+                return await func(self, *args, **kwargs)
+            
+            cache_key = generate_cache_key(prefix, func.__name__, args, kwargs)
+            
+            try:
+                cached_data = await cache_client.get(cache_key)
+                if cached_data is not None:
+                    logger.debug(f"Cache hit for key: {cache_key}")
+                    return cached_data
+            except Exception as e:
+                logger.error(f"Unexpected error in cached_raw_json decorator: {str(e)}")
+                return await func(self, *args, **kwargs)
+            
+            logger.debug(f"Cache miss for key: {cache_key}")
+            body = await func(self, *args, **kwargs)
+            
+            try:
+                async with cache_client.pipeline(transaction=False) as pipe:
+                    _queue_store(pipe, cache_key, ttl, body, _as_list(tags(self, *args, **kwargs)) if tags else [])
+                    await pipe.execute()
+            except Exception as e:
+                logger.error(f"Could not cache result for key: {cache_key}: {str(e)}")
+            
+            return body
+        
+        return async_wrapper
+    
+    return decorator
+
+
+# Background refreshes run outside any request, so they open their own session
+_background_session = asynccontextmanager(get_session)
+_refreshing: Set[str] = set()
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def cached_background(
+    prefix: str,
+    refresh_interval: int = 3600,  # Default: recompute hourly
+    max_stale: int = 86400,  # Drop entries nobody has read for a day
+    model: Optional[Union[type, TypeAdapter]] = None
+):
+    """
+    Stale-while-revalidate caching for expensive, slowly changing results.
+    
+    Entries are never invalidated by writes. Once an entry is older than
+    refresh_interval, the next read still returns it immediately and starts a
+    single background task that recomputes it with its own database session.
+    Only a cold miss runs the function inline.
+    
+    The decorated method must take the database session as its first argument
+    after self.
+    
+    Args:
+        prefix: Prefix for the cache key
+        refresh_interval: Age in seconds after which an entry is refreshed
+        max_stale: Time to live in seconds of an entry in Redis
+        model: Model class the method returns, alone or in a list, or a
+            TypeAdapter for the whole return type; hits are rebuilt with it
+            (see cached)
+        
+    Returns:
+        Decorated function
+    
+    Example:
+        @cached_background("book_service", refresh_interval=3600)
+        async def get_popular_books(self, db: AsyncSession, limit: int = 10) -> List[Book]:
+            # Function implementation
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        
+        async def store(cache_client, cache_key: str, result: Any) -> None:
+            if result is None:
+                return
+            try:
+                entry = serialize_cache_data({"refreshed_at": time.time(), "data": result})
+                await cache_client.setex(cache_key, max_stale, entry)
+            except Exception as e:
+                logger.error(f"Could not cache result for key: {cache_key}: {str(e)}")
+        
+        async def refresh(self, cache_client, cache_key: str, args: Tuple, kwargs: Dict[str, Any]) -> None:
+            try:
+                async with _background_session() as session:
+                    result = await func(self, session, *args[1:], **kwargs)
+                await store(cache_client, cache_key, result)
+                logger.debug(f"Refreshed cache key in background: {cache_key}")
+            except Exception as e:
+                logger.error(f"Background refresh failed for key: {cache_key}: {str(e)}")
+            finally:
+                _refreshing.discard(cache_key)
+        
+        @functools.wraps(func)
+        async def async_wrapper(self, *args, **kwargs):
+            args, kwargs = _bind_call(signature, args, kwargs)
+            cache_client = getattr(self, "cache", None)
+            if not isinstance(cache_client, AsyncRedis):
+                return await func(self, *args, **kwargs)
+            
+            cache_key = generate_cache_key(prefix, func.__name__, args, kwargs)
+            
+            try:
+                cached_data = await cache_client.get(cache_key)
+                entry = deserialize_cache_data(cached_data) if cached_data else None
+            except Exception as e:
+                logger.error(f"Unexpected error in cached_background decorator: {str(e)}")
+                entry = None
+            
+            if entry is not None:
+                if time.time() - entry["refreshed_at"] >= refresh_interval and cache_key not in _refreshing:
+                    _refreshing.add(cache_key)
+                    task = asyncio.create_task(refresh(self, cache_client, cache_key, args, kwargs))
+                    _background_tasks.add(task)
+                    task.add_done_callback(_background_tasks.discard)
+                return _rebuild(model, entry["data"])
+            
+            logger.debug(f"Cache miss for key: {cache_key}")
+            result = await func(self, *args, **kwargs)
+            await store(cache_client, cache_key, result)
+            return result
+        
+        return async_wrapper
+    
+    return decorator
+
+
 def invalidate_cache(
     prefix: str,
     key_pattern: Optional[str] = None,
-    key_builder: Optional[Callable] = None
+    key_builder: Optional[Callable] = None,
+    tags: Optional[Callable] = None
 ):
     """
     Decorator to invalidate cache entries after a function is executed.
@@ -220,6 +740,9 @@ def invalidate_cache(
         prefix: Prefix for the cache key
         key_pattern: Optional pattern for cache keys to invalidate (can include *)
         key_builder: Optional custom function to generate the exact cache key or list of keys
+            (keys may contain * to invalidate every matching entry; see cache_key)
+        tags: Optional function, called like key_builder, returning tags whose
+            recorded entries (see cached) are deleted. Combines with key_builder.
         
     Returns:
         Decorated function
@@ -228,10 +751,19 @@ def invalidate_cache(
         @invalidate_cache("user_service", "user:*")
         async def update_user(self, user_id: int, user_data: UserUpdate) -> User:
             # Function implementation
+            
+        @invalidate_cache("book_service", key_builder=lambda self, db, book_id, *args, **kwargs: [
+            cache_key("book_service", "get_book_with_categories", book_id)
+        ])
+        async def update_book(self, db, book_id, book_in) -> Book:
+            # Function implementation
     """
     def decorator(func):
+        signature = inspect.signature(func)
+        
         @functools.wraps(func)
         async def async_wrapper(self, *args, **kwargs):
+            args, kwargs = _bind_call(signature, args, kwargs)
             # Execute function first
             result = await func(self, *args, **kwargs)
             
@@ -245,38 +777,24 @@ def invalidate_cache(
             
             try:
                 # Determine keys to invalidate
-                if key_builder:
-                    # Custom key builder can return a single key or list of keys
-                    keys_to_invalidate = key_builder(self, *args, **kwargs, result=result)
-                    if isinstance(keys_to_invalidate, str):
-                        keys_to_invalidate = [keys_to_invalidate]
+                if key_builder or tags:
+                    if key_builder:
+                        # Custom key builder can return a single key or list of keys
+                        keys_to_invalidate = _as_list(key_builder(self, *args, **kwargs, result=result))
+                        await _delete_keys(cache_client, keys_to_invalidate)
                     
-                    for key in keys_to_invalidate:
-                        await cache_client.delete(key)
-                        logger.debug(f"Invalidated cache key: {key}")
+                    if tags:
+                        # Entries recorded under these tags by @cached(tags=...)
+                        await _invalidate_tags(cache_client, _as_list(tags(self, *args, **kwargs, result=result)))
                 
                 elif key_pattern:
-                    # If pattern includes wildcard, use scan and delete
-                    if '*' in key_pattern:
-                        pattern = f"{prefix}:{key_pattern}"
-                        cursor = 0
-                        while True:
-                            cursor, keys = await cache_client.scan(cursor, match=pattern, count=100)
-                            if keys:
-                                for key in keys:
-                                    await cache_client.delete(key)
-                                    logger.debug(f"Invalidated cache key: {key.decode()}")
-                            if cursor == 0:
-                                break
-                    else:
-                        # If no wildcard, direct delete
-                        full_key = f"{prefix}:{key_pattern}"
-                        await cache_client.delete(full_key)
-                        logger.debug(f"Invalidated cache key: {full_key}")
+                    # A wildcard pattern is removed with one UNLINK per SCAN page,
+                    # not one DELETE round trip per matching key
+                    await _delete_keys(cache_client, [f"{prefix}:{key_pattern}"])
                 else:
                     # Default: invalidate function-specific cache with same args
                     cache_key = generate_cache_key(prefix, func.__name__, args, kwargs)
-                    await cache_client.delete(cache_key)
+                    await cache_client.unlink(cache_key)
                     logger.debug(f"Invalidated cache key: {cache_key}")
             except Exception as e:
                 logger.error(f"Error invalidating cache: {str(e)}")
@@ -285,6 +803,7 @@ def invalidate_cache(
         
         @functools.wraps(func)
         def sync_wrapper(self, *args, **kwargs):
+            args, kwargs = _bind_call(signature, args, kwargs)
             # Execute function first
             result = func(self, *args, **kwargs)
             
@@ -298,38 +817,24 @@ def invalidate_cache(
             
             try:
                 # Determine keys to invalidate
-                if key_builder:
-                    # Custom key builder can return a single key or list of keys
-                    keys_to_invalidate = key_builder(self, *args, **kwargs, result=result)
-                    if isinstance(keys_to_invalidate, str):
-                        keys_to_invalidate = [keys_to_invalidate]
+                if key_builder or tags:
+                    if key_builder:
+                        # Custom key builder can return a single key or list of keys
+                        keys_to_invalidate = _as_list(key_builder(self, *args, **kwargs, result=result))
+                        _delete_keys_sync(cache_client, keys_to_invalidate)
                     
-                    for key in keys_to_invalidate:
-                        cache_client.delete(key)
-                        logger.debug(f"Invalidated cache key: {key}")
+                    if tags:
+                        # Entries recorded under these tags by @cached(tags=...)
+                        _invalidate_tags_sync(cache_client, _as_list(tags(self, *args, **kwargs, result=result)))
                 
                 elif key_pattern:
-                    # If pattern includes wildcard, use scan and delete
-                    if '*' in key_pattern:
-                        pattern = f"{prefix}:{key_pattern}"
-                        cursor = 0
-                        while True:
-                            cursor, keys = cache_client.scan(cursor, match=pattern, count=100)
-                            if keys:
-                                for key in keys:
-                                    cache_client.delete(key)
-                                    logger.debug(f"Invalidated cache key: {key.decode()}")
-                            if cursor == 0:
-                                break
-                    else:
-                        # If no wildcard, direct delete
-                        full_key = f"{prefix}:{key_pattern}"
-                        cache_client.delete(full_key)
-                        logger.debug(f"Invalidated cache key: {full_key}")
+                    # A wildcard pattern is removed with one UNLINK per SCAN page,
+                    # not one DELETE round trip per matching key
+                    _delete_keys_sync(cache_client, [f"{prefix}:{key_pattern}"])
                 else:
                     # Default: invalidate function-specific cache with same args
                     cache_key = generate_cache_key(prefix, func.__name__, args, kwargs)
-                    cache_client.delete(cache_key)
+                    cache_client.unlink(cache_key)
                     logger.debug(f"Invalidated cache key: {cache_key}")
             except Exception as e:
                 logger.error(f"Error invalidating cache: {str(e)}")
@@ -1,7 +1,7 @@
 import functools
 import logging
 import traceback
-from typing import Callable, Optional, Dict, Any, Type, Union
+from typing import Callable, Optional, Dict, Any, Union
 from fastapi import Request
 from fastapi.responses import JSONResponse
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError, OperationalError, NoResultFound
@@ -9,8 +9,7 @@ from utils.exceptions.db import (
     DatabaseException,
     ConnectionException,
     QueryException,
-    IntegrityException,
-    TransactionException
+    IntegrityException
 )
 
 # Setup logger
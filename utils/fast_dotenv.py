@@ -0,0 +1,120 @@
+from pathlib import Path
+from typing import Dict, Union
+
+# 1 for bytes allowed in a variable name: A-Z a-z 0-9 _ . -
+_KEYCHAR = bytes(
+    1 if (48 <= i <= 57 or 65 <= i <= 90 or 97 <= i <= 122 or i in (95, 46, 45)) else 0
+    for i in range(256)
+)
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", '"': '"', "\\": "\\"}
+
+_TAB = 9
+_SPACE = 32
+_HASH = 35
+_BACKSLASH = 92
+_DOUBLE_QUOTE = 34
+_SINGLE_QUOTE = 39
+
+
+def _find_closing_quote(buf: bytes, start: int, quote: int) -> int:
+    """Index of the quote closing a value that opened at start - 1, or -1"""
+    pos = start
+    while True:
+        index = buf.find(bytes((quote,)), pos)
+        if index == -1 or quote == _SINGLE_QUOTE:
+            return index
+        # A double quote preceded by an odd number of backslashes is escaped
+        backslashes = 0
+        while index - backslashes > start and buf[index - backslashes - 1] == _BACKSLASH:
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return index
+        pos = index + 1
+
+
+def _unescape(text: str) -> str:
+    """Decode backslash escapes in a double-quoted value"""
+    parts = []
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == "\\" and i + 1 < len(text):
+            parts.append(_ESCAPES.get(text[i + 1], "\\" + text[i + 1]))
+            i += 2
+        else:
+            parts.append(char)
+            i += 1
+    return "".join(parts)
+
+
+def parse_dotenv(buf: bytes) -> Dict[str, str]:
+    """
+    Parse the contents of a .env file.
+
+    Scans the raw bytes with find() for the line, '=' and quote boundaries
+    instead of matching every line against regular expressions. Supports
+    comments, `export` prefixes, single and double quotes (double quotes with
+    backslash escapes, both possibly spanning lines) and inline ` #` comments
+    after unquoted values. Lines without '=' and invalid names are skipped.
+    Variable interpolation (${VAR}) is not supported.
+    """
+    if b"\r" in buf:
+        buf = buf.replace(b"\r\n", b"\n")
+
+    values: Dict[str, str] = {}
+    pos, end = 0, len(buf)
+    while pos < end:
+        line_end = buf.find(b"\n", pos)
+        if line_end == -1:
+            line_end = end
+
+        equals = buf.find(b"=", pos, line_end)
+        if equals == -1:
+            # Blank line, comment or a name without a value
+            pos = line_end + 1
+            continue
+
+        key = buf[pos:equals].strip()
+        if key.startswith(b"export "):
+            key = key[7:].lstrip()
+        if not key or key[0] == _HASH or not all(_KEYCHAR[c] for c in key):
+            pos = line_end + 1
+            continue
+
+        start = equals + 1
+        while start < line_end and buf[start] in (_SPACE, _TAB):
+            start += 1
+        quote = buf[start] if start < line_end else 0
+
+        if quote in (_DOUBLE_QUOTE, _SINGLE_QUOTE):
+            close = _find_closing_quote(buf, start + 1, quote)
+            if close == -1:
+                # Unterminated quote: take the rest of the line
+                text = buf[start + 1:line_end].decode()
+            else:
+                text = buf[start + 1:close].decode()
+                line_end = buf.find(b"\n", close)
+                if line_end == -1:
+                    line_end = end
+            if quote == _DOUBLE_QUOTE and "\\" in text:
+                text = _unescape(text)
+        else:
+            value = buf[start:line_end]
+            comment = value.find(b" #")
+            if comment != -1:
+                value = value[:comment]
+            text = value.rstrip().decode()
+
+        values[key.decode()] = text
+        pos = line_end + 1
+
+    return values
+
+
+def read_dotenv(path: Union[str, Path] = ".env") -> Dict[str, str]:
+    """Read and parse a .env file; a missing file yields no values"""
+    try:
+        buf = Path(path).read_bytes()
+    except FileNotFoundError:
+        return {}
+    return parse_dotenv(buf)
\ No newline at end of file
@@ -0,0 +1,63 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Tuple
+
+
+class _InProcessQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues records as they are.
+    
+    The default prepare() formats the message and drops exc_info so records can
+    be pickled to another process; the listener here is a thread in the same
+    process, so the JSON formatters still get the original record to work with.
+    """
+    def prepare(self, record):
+        return record
+
+
+# (logger, its queue handler, its original handlers, listener) per moved logger
+_moved: List[Tuple[logging.Logger, QueueHandler, List[logging.Handler], QueueListener]] = []
+
+
+def start_background_logging() -> None:
+    """
+    Move every configured handler behind a queue drained by a background thread.
+    
+    Each logger with handlers (the root logger, uvicorn's and the API, DB and AI
+    loggers) gets a single QueueHandler instead, so logging from the event loop
+    is an in-memory put and the file and stream I/O happens on the listener's
+    thread. Call stop_background_logging on shutdown to flush what is queued.
+    """
+    if _moved:
+        return
+    
+    loggers = [logging.getLogger()] + [
+        logger for logger in logging.Logger.manager.loggerDict.values()
+        if isinstance(logger, logging.Logger)
+    ]
+    for logger in loggers:
+        handlers = [handler for handler in logger.handlers if not isinstance(handler, QueueHandler)]
+        if not handlers:
+            continue
+        
+        # SimpleQueue is unbounded and implemented in C, with no lock on put
+        log_queue = queue.SimpleQueue()
+        queue_handler = _InProcessQueueHandler(log_queue)
+        for handler in handlers:
+            logger.removeHandler(handler)
+        logger.addHandler(queue_handler)
+        
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        _moved.append((logger, queue_handler, handlers, listener))
+
+
+def stop_background_logging() -> None:
+    """Flush the queued records, stop the listener threads and put the handlers back"""
+    while _moved:
+        logger, queue_handler, handlers, listener = _moved.pop()
+        logger.removeHandler(queue_handler)
+        listener.stop()
+        for handler in handlers:
+            logger.addHandler(handler)
\ No newline at end of file
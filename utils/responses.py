@@ -0,0 +1,115 @@
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Sequence
+import msgspec
+import orjson
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlmodel.ext.asyncio.session import AsyncSession
+from db.engine import get_session
+
+# Book rows carry their pgvector embedding as a numpy array
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+# Streamed bodies outlive the request's session, so they open their own
+_stream_session = asynccontextmanager(get_session)
+
+
+def orjson_list_response(items: Sequence[BaseModel], status_code: int = 200) -> Response:
+    """
+    Serialize a list of response models straight to JSON bytes with orjson.
+    
+    Meant for the heaviest list endpoints (book listings, search results,
+    recommendations). Returning a plain Response skips FastAPI's response_model
+    validation and its per-field jsonable_encoder walk; orjson encodes the UUIDs
+    and datetimes left by model_dump natively, and numpy embeddings too.
+    
+    Args:
+        items: Response models to return, e.g. BookWithCategories
+        status_code: HTTP status code of the response
+        
+    Returns:
+        A Response with an application/json body
+    """
+    content = orjson.dumps([item.model_dump() for item in items], option=_ORJSON_OPTIONS)
+    return Response(content=content, status_code=status_code, media_type="application/json")
+
+
+def msgspec_response(content: Any, status_code: int = 200) -> Response:
+    """
+    Encode msgspec output structs (see schemas *ReadMsg) straight to a JSON Response.
+    
+    The pydantic read schemas stay as response_model for the OpenAPI docs; the
+    body itself is produced by msgspec's encoder.
+    
+    Args:
+        content: A struct, or a list of structs, built with schemas.base.to_msg
+        status_code: HTTP status code of the response
+        
+    Returns:
+        A Response with an application/json body
+    """
+    return Response(content=msgspec.json.encode(content), status_code=status_code, media_type="application/json")
+
+
+def adapter_list_response(adapter: TypeAdapter, items: Sequence[BaseModel], status_code: int = 200) -> Response:
+    """
+    Serialize a list of response models with a prebuilt TypeAdapter.
+    
+    dump_json runs entirely in pydantic-core and writes the JSON bytes directly,
+    so no *ListResponse wrapper and no intermediate dicts are built.
+    
+    Args:
+        adapter: A module-level list adapter such as schemas.book.book_list_adapter
+        items: Response models to return
+        status_code: HTTP status code of the response
+        
+    Returns:
+        A Response with an application/json body
+    """
+    return Response(content=adapter.dump_json(items), status_code=status_code, media_type="application/json")
+
+
+def json_bytes_response(content: bytes, status_code: int = 200) -> Response:
+    """
+    Send an already encoded JSON body, e.g. from a @cached_raw_json service method.
+    
+    Args:
+        content: JSON bytes to send unchanged
+        status_code: HTTP status code of the response
+        
+    Returns:
+        A Response with an application/json body
+    """
+    return Response(content=content, status_code=status_code, media_type="application/json")
+
+
+def orjson_lines_response(
+    stream: Callable[[AsyncSession], AsyncIterator[Any]],
+    status_code: int = 200
+) -> StreamingResponse:
+    """
+    Stream records as newline-delimited JSON while they are read from the database.
+    
+    For table exports, e.g. orjson_lines_response(book_service.stream_all): each
+    record is encoded with orjson and sent as soon as it arrives, so neither the
+    rows nor the body are held in memory at once.
+    
+    The body is sent after the endpoint returns, and FastAPI closes the request's
+    get_session session before that. stream is therefore called with a session
+    opened by the response itself and kept open until the last line is sent.
+    
+    Args:
+        stream: Function taking a database session and returning an async iterator
+            of ORM rows or response models (map User rows to UserRead first: the
+            rows carry the password hash)
+        status_code: HTTP status code of the response
+        
+    Returns:
+        A StreamingResponse with an application/x-ndjson body
+    """
+    async def encode_lines():
+        async with _stream_session() as session:
+            async for item in stream(session):
+                yield orjson.dumps(item.model_dump(), option=_ORJSON_OPTIONS) + b"\n"
+    
+    return StreamingResponse(encode_lines(), status_code=status_code, media_type="application/x-ndjson")
\ No newline at end of file